@@ -0,0 +1,17 @@
+from manim import *
+
+
+class LongAnimation(Scene):
+    def construct(self):
+        axes = Axes(x_range=[-4, 4], y_range=[-2, 2])
+        dot = Dot(color=YELLOW)
+        self.play(Create(axes))
+        self.add(dot)
+        for i in range(40):
+            phase = i * PI / 10
+            self.play(
+                dot.animate.move_to(axes.c2p(3 * np.cos(phase), 1.5 * np.sin(phase))),
+                run_time=0.5,
+            )
+        graph = axes.plot(np.sin, color=BLUE)
+        self.play(Create(graph), run_time=3)
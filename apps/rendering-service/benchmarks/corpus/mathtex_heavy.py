@@ -0,0 +1,18 @@
+from manim import *
+
+
+class MathTexHeavy(Scene):
+    def construct(self):
+        equations = VGroup(
+            MathTex(r"e^{i\pi} + 1 = 0"),
+            MathTex(r"\int_0^\infty e^{-x^2}\,dx = \frac{\sqrt{\pi}}{2}"),
+            MathTex(r"\sum_{n=1}^{\infty} \frac{1}{n^2} = \frac{\pi^2}{6}"),
+            MathTex(r"\nabla \cdot \mathbf{E} = \frac{\rho}{\varepsilon_0}"),
+            MathTex(r"\det(A - \lambda I) = 0"),
+        ).arrange(DOWN, buff=0.4)
+        title = Tex("Famous identities").to_edge(UP)
+        self.play(Write(title))
+        for equation in equations:
+            self.play(Write(equation), run_time=0.8)
+        self.play(TransformMatchingTex(equations[4].copy(), MathTex(r"Av = \lambda v")))
+        self.wait(0.5)
@@ -0,0 +1,12 @@
+from manim import *
+
+
+class SimpleShapes(Scene):
+    def construct(self):
+        circle = Circle(color=BLUE, fill_opacity=0.5)
+        square = Square(color=GREEN).shift(RIGHT * 3)
+        triangle = Triangle(color=RED).shift(LEFT * 3)
+        self.play(Create(circle), Create(square), Create(triangle))
+        self.play(circle.animate.scale(1.5), square.animate.rotate(PI / 4))
+        self.play(Transform(triangle, Star(color=YELLOW).shift(LEFT * 3)))
+        self.play(FadeOut(circle, square, triangle))
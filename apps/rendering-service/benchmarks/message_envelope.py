@@ -0,0 +1,66 @@
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from render_analysis import analysis, envelope
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+
+def decode_raw(data: bytes, attributes: dict) -> dict:
+    code = data.decode("utf-8").strip()
+    return analysis.from_attributes(attributes) or analysis.analyze(code)
+
+
+def decode_envelope(data: bytes) -> dict:
+    return envelope.decode(data)["analysis"]
+
+
+def measure(code: str, repeat: int) -> dict:
+    record = analysis.analyze(code)
+    raw = code.encode("utf-8")
+    raw_attributes = analysis.to_attributes(record)
+    full = envelope.encode(envelope.job_body(code, record))
+    hash_only = envelope.encode(envelope.job_body(None, record))
+
+    def per_call_us(function) -> float:
+        return min(timeit.repeat(function, number=repeat, repeat=5)) / repeat * 1e6
+
+    return {
+        "raw_bytes": len(raw) + sum(map(len, raw_attributes.values())),
+        "envelope_bytes": len(full),
+        "hash_only_bytes": len(hash_only),
+        "raw_decode_us": per_call_us(lambda: decode_raw(raw, {})),
+        "raw_attrs_decode_us": per_call_us(lambda: decode_raw(raw, raw_attributes)),
+        "envelope_decode_us": per_call_us(lambda: decode_envelope(full)),
+        "hash_only_decode_us": per_call_us(lambda: decode_envelope(hash_only)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare render job message formats by size and decode time."
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = {
+        path.stem: measure(path.read_text(encoding="utf-8"), args.repeat)
+        for path in sorted(CORPUS_DIR.glob("*.py"))
+    }
+    columns = list(next(iter(report.values())))
+    width = max(map(len, columns)) + 2
+    print(f"{'scene':<16}" + "".join(f"{column:>{width}}" for column in columns))
+    for name, row in report.items():
+        print(
+            f"{name:<16}" + "".join(f"{row[column]:>{width}.1f}" for column in columns)
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from rendering_service import services, storage
+from rendering_service.core.config import settings
+from rendering_service.worker_pool import RenderWorkerPool
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.messages: list[tuple[str, dict]] = []
+
+    def pipeline(self, transaction: bool = False):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeAsyncRedis):
+        self.redis = redis
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def publish(self, channel: str, payload: str):
+        self.pending.append((channel, json.loads(payload)))
+
+    async def execute(self):
+        self.redis.messages.extend(self.pending)
+        self.pending = []
+
+
+def load_corpus(names: list[str] | None) -> dict[str, str]:
+    corpus = {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.py"))
+    }
+    if names:
+        corpus = {name: corpus[name] for name in names}
+    return corpus
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(round(fraction * (len(ordered) - 1)), len(ordered) - 1)
+    return ordered[index]
+
+
+def video_seconds(path: str) -> float:
+    import av
+
+    with av.open(path) as container:
+        return container.duration / av.time_base
+
+
+def cpu_seconds(usage: resource.struct_rusage) -> float:
+    return usage.ru_utime + usage.ru_stime
+
+
+def commit_hash() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure(storage_dir: str, scratch_dir: str, concurrency: int, quality: str):
+    settings.RENDER_CONCURRENCY = concurrency
+    settings.RENDER_QUALITY = quality
+    settings.RENDER_SCRATCH_DIR = scratch_dir
+    settings.RENDER_CACHE_ENABLED = False
+    settings.MEDIA_CACHE_ENABLED = False
+    settings.SINGLEFLIGHT_ENABLED = False
+    settings.CANCEL_SUPERSEDED_RENDERS = False
+    settings.PROGRESSIVE_RENDERING = False
+    settings.STORAGE_BACKEND = "local"
+    settings.LOCAL_STORAGE_DIR = storage_dir
+    services.video_store = storage.LocalStore(storage_dir, "http://benchmark.local")
+
+
+async def replay(corpus: dict[str, str], repeat: int) -> list[dict]:
+    from rendering_service.main import PubSubMessage, process_message
+
+    loop = asyncio.get_running_loop()
+
+    async def submit(name: str, code: str, index: int) -> dict:
+        message = PubSubMessage(
+            data=base64.b64encode(code.encode("utf-8")).decode("ascii"),
+            attributes={
+                "job_id": f"bench-{name}-{index}",
+                "user_id": f"benchmark-{index}",
+                "source_id": name,
+                "source_type": "canvas",
+            },
+        )
+        started = time.perf_counter()
+        acknowledged = await loop.run_in_executor(None, process_message, message)
+        return {
+            "scene": name,
+            "job_id": message.attributes["job_id"],
+            "seconds": time.perf_counter() - started,
+            "acknowledged": acknowledged,
+        }
+
+    return await asyncio.gather(
+        *(
+            submit(name, code, index)
+            for index in range(repeat)
+            for name, code in corpus.items()
+        )
+    )
+
+
+async def run(args) -> dict:
+    corpus = load_corpus(args.scenes)
+    with (
+        tempfile.TemporaryDirectory() as storage_dir,
+        tempfile.TemporaryDirectory() as scratch_dir,
+    ):
+        configure(storage_dir, scratch_dir, args.concurrency, args.quality)
+        from rendering_service.main import render_pipeline
+
+        fake_redis = FakeAsyncRedis()
+        await services.publisher.start(fake_redis)
+        services.render_pool = RenderWorkerPool(
+            size=args.concurrency, max_jobs_per_worker=1000
+        )
+        services.render_pool.start()
+        render_pipeline.start()
+
+        await replay(corpus, 1)
+        fake_redis.messages.clear()
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        started = time.perf_counter()
+        jobs = await replay(corpus, args.repeat)
+        wall_seconds = time.perf_counter() - started
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+
+        render_pipeline.stop()
+        services.render_pool.shutdown()
+        await services.publisher.stop()
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        published = {
+            message["job_id"]: message
+            for channel, message in fake_redis.messages
+            if channel == settings.REDIS_CHANNEL
+        }
+        failures = [
+            job["job_id"]
+            for job in jobs
+            if published.get(job["job_id"], {}).get("status") != "success"
+        ]
+        if failures:
+            raise RuntimeError(f"Benchmark jobs failed: {', '.join(failures)}")
+        rendered_seconds = sum(
+            video_seconds(
+                os.path.join(storage_dir, os.path.basename(message["video_url"]))
+            )
+            for message in published.values()
+        )
+
+    latencies = [job["seconds"] for job in jobs]
+    per_scene = {
+        name: {
+            "p50_seconds": statistics.median(
+                job["seconds"] for job in jobs if job["scene"] == name
+            ),
+        }
+        for name in corpus
+    }
+    total_cpu = (
+        cpu_seconds(self_after) - cpu_seconds(self_before) + cpu_seconds(children)
+    )
+    return {
+        "commit": commit_hash(),
+        "jobs": len(jobs),
+        "concurrency": args.concurrency,
+        "quality": args.quality,
+        "p50_seconds": percentile(latencies, 0.5),
+        "p95_seconds": percentile(latencies, 0.95),
+        "jobs_per_minute": len(jobs) / wall_seconds * 60,
+        "cpu_seconds_per_video_second": total_cpu / rendered_seconds,
+        "peak_worker_rss_mb": children.ru_maxrss / 1024,
+        "peak_service_rss_mb": self_after.ru_maxrss / 1024,
+        "scenes": per_scene,
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"{report['jobs']} jobs at concurrency {report['concurrency']} "
+        f"({report['quality']}, commit {report['commit']})"
+    )
+    for key in (
+        "p50_seconds",
+        "p95_seconds",
+        "jobs_per_minute",
+        "cpu_seconds_per_video_second",
+        "peak_worker_rss_mb",
+        "peak_service_rss_mb",
+    ):
+        print(f"{key:>30} {report[key]:>10.2f}")
+    for name, scene in report["scenes"].items():
+        print(f"{name:>30} {scene['p50_seconds']:>10.2f}s p50")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay the scene corpus through the render pipeline."
+    )
+    parser.add_argument("--scenes", nargs="+", help="Corpus scenes to replay.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--quality", default="low_quality")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from rendering_service import services
+from rendering_service.worker_pool import RenderWorkerPool
+
+LONG_SCENE = """
+from manim import *
+
+class LongScene(Scene):
+    def construct(self):
+        square = Square()
+        self.add(square)
+        for i in range({animations}):
+            self.play(square.animate.rotate(PI / 7).shift(RIGHT * 0.01), run_time=1)
+"""
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def run(cores: list[int], animations: int, quality: str):
+    code = LONG_SCENE.format(animations=animations)
+    services.settings.MEDIA_CACHE_ENABLED = False
+    results = []
+    for core_count in cores:
+        services.render_pool = RenderWorkerPool(
+            size=core_count, max_jobs_per_worker=1000
+        )
+        services.render_pool.start()
+        try:
+            with tempfile.TemporaryDirectory() as media_dir:
+                started = time.perf_counter()
+                services.render_video(
+                    code,
+                    "LongScene",
+                    media_dir,
+                    quality,
+                    services.RenderOptions(segments=core_count),
+                )
+                results.append((core_count, time.perf_counter() - started))
+        finally:
+            services.render_pool.shutdown()
+
+    baseline = results[0][1]
+    print(f"{'cores':>5} {'wall_s':>8} {'speedup':>8}")
+    for core_count, seconds in results:
+        print(f"{core_count:>5} {seconds:>8.2f} {baseline / seconds:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure segmented render wall-clock time against core count."
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--animations", type=int, default=48)
+    parser.add_argument("--quality", default="low_quality")
+    args = parser.parse_args()
+    run(args.cores, args.animations, args.quality)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import datetime
+import logging
+
+from rendering_service import services
+from rendering_service.core.config import settings
+
+
+def latest_request_key(source_type: str, source_id: str) -> str:
+    return f"{settings.LATEST_REQUEST_PREFIX}:{source_type}:{source_id}"
+
+
+def is_superseded(job) -> bool:
+    if (
+        not settings.CANCEL_SUPERSEDED_RENDERS
+        or not services.redis_client
+        or not job.source_id
+        or not job.request_timestamp
+    ):
+        return False
+    try:
+        requested_at = datetime.datetime.fromisoformat(job.request_timestamp)
+    except ValueError:
+        return False
+    try:
+        latest = services.redis_client.get(
+            latest_request_key(job.source_type, job.source_id)
+        )
+    except Exception as e:
+        logging.warning(f"Checking for a newer request for '{job.job_id}' failed: {e}")
+        return False
+    return latest is not None and float(latest) > requested_at.timestamp()
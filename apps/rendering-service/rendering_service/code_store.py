@@ -0,0 +1,29 @@
+import logging
+
+from rendering_service import services
+from rendering_service.core.config import settings
+
+
+def code_key(code_hash: str) -> str:
+    return f"{settings.CODE_STORE_PREFIX}:{code_hash}"
+
+
+def remember(code_hash: str, code: str):
+    if not settings.CODE_STORE_ENABLED or not services.redis_client:
+        return
+    try:
+        services.redis_client.set(
+            code_key(code_hash), code, ex=settings.CODE_STORE_TTL_SECONDS
+        )
+    except Exception as e:
+        logging.warning(f"Storing code '{code_hash}' failed: {e}")
+
+
+def fetch(code_hash: str) -> str | None:
+    if not services.redis_client:
+        return None
+    try:
+        return services.redis_client.get(code_key(code_hash))
+    except Exception as e:
+        logging.warning(f"Fetching code '{code_hash}' failed: {e}")
+        return None
@@ -0,0 +1,118 @@
+import contextlib
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import AlreadyExists
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+
+from rendering_service.core.config import settings
+
+MessageHandler = Callable[[bytes, dict], Future | None]
+
+
+def _client_kwargs() -> dict:
+    if not settings.PUBSUB_EMULATOR_HOST:
+        return {}
+    return {
+        "credentials": AnonymousCredentials(),
+        "client_options": ClientOptions(api_endpoint=settings.PUBSUB_EMULATOR_HOST),
+    }
+
+
+def max_outstanding_messages() -> int:
+    return settings.PULL_MAX_MESSAGES or settings.RENDER_CONCURRENCY * 2
+
+
+class PullConsumer:
+    def __init__(self, handler: MessageHandler):
+        self.handler = handler
+        self.subscriber: pubsub_v1.SubscriberClient | None = None
+        self.streaming_pull = None
+
+    def subscription_path(self) -> str:
+        if settings.SUBSCRIPTION_NAME.startswith("projects/"):
+            return settings.SUBSCRIPTION_NAME
+        return pubsub_v1.SubscriberClient.subscription_path(
+            settings.GCP_PROJECT_ID, settings.SUBSCRIPTION_NAME
+        )
+
+    def _ensure_emulator_subscription(self, subscription: str):
+        publisher = pubsub_v1.PublisherClient(**_client_kwargs())
+        topic = publisher.topic_path(settings.GCP_PROJECT_ID, settings.RENDER_TOPIC_ID)
+        with contextlib.suppress(AlreadyExists):
+            publisher.create_topic(name=topic)
+        with contextlib.suppress(AlreadyExists):
+            self.subscriber.create_subscription(
+                name=subscription,
+                topic=topic,
+                ack_deadline_seconds=settings.PULL_ACK_DEADLINE_SECONDS,
+            )
+            logging.info(f"Created emulator subscription '{subscription}'.")
+
+    def start(self):
+        if self.streaming_pull:
+            return
+        self.subscriber = pubsub_v1.SubscriberClient(**_client_kwargs())
+        subscription = self.subscription_path()
+        if settings.PUBSUB_EMULATOR_HOST:
+            self._ensure_emulator_subscription(subscription)
+
+        max_messages = max_outstanding_messages()
+        flow_control = pubsub_v1.types.FlowControl(
+            max_messages=max_messages,
+            max_bytes=settings.PULL_MAX_BYTES,
+            max_lease_duration=settings.PULL_MAX_LEASE_SECONDS,
+            min_duration_per_lease_extension=settings.PULL_ACK_DEADLINE_SECONDS,
+        )
+        scheduler = ThreadScheduler(
+            ThreadPoolExecutor(
+                max_workers=max_messages, thread_name_prefix="pubsub-callback"
+            )
+        )
+        self.streaming_pull = self.subscriber.subscribe(
+            subscription,
+            callback=self.on_message,
+            flow_control=flow_control,
+            scheduler=scheduler,
+        )
+        logging.info(
+            f"Streaming pull started on '{subscription}' with at most "
+            f"{max_messages} outstanding messages."
+        )
+
+    def stop(self):
+        if not self.streaming_pull:
+            return
+        self.streaming_pull.cancel()
+        with contextlib.suppress(Exception):
+            self.streaming_pull.result(timeout=30)
+        self.subscriber.close()
+        self.streaming_pull = None
+        self.subscriber = None
+        logging.info("Streaming pull stopped.")
+
+    def on_message(self, message):
+        try:
+            done = self.handler(message.data, dict(message.attributes))
+        except Exception as e:
+            logging.error(f"Failed to submit message {message.message_id}: {e}")
+            message.nack()
+            return
+        if done is None:
+            message.ack()
+            return
+
+        def settle(future: Future):
+            try:
+                if future.exception() is None and future.result():
+                    message.ack()
+                else:
+                    message.nack()
+            except Exception as e:
+                logging.warning(f"Could not settle message {message.message_id}: {e}")
+
+        done.add_done_callback(settle)
@@ -1,5 +1,7 @@
 import logging
+import os
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
@@ -11,8 +13,97 @@ class Settings(BaseSettings):
     REDIS_HOST: str | None = None
     REDIS_PORT: int | None = None
     REDIS_CHANNEL: str | None = "video_links"
+    REDIS_PROGRESS_CHANNEL: str = "render_progress"
+    PROGRESS_MIN_INTERVAL_SECONDS: float = 1.0
+    REDIS_MAX_CONNECTIONS: int = 16
+    REDIS_PUBLISH_BUFFER_SIZE: int = 10000
+    REDIS_PUBLISH_BATCH_SIZE: int = 100
+    REDIS_PUBLISH_RETRY_BASE_SECONDS: float = 0.5
+    REDIS_PUBLISH_RETRY_MAX_SECONDS: float = 30.0
     SUBSCRIPTION_NAME: str | None = "manim-render-requests-sub"
+    CONSUMER_MODE: str = "push"
+    GCP_PROJECT_ID: str | None = "local-project"
+    RENDER_TOPIC_ID: str = "manim-render-requests"
+    PUBSUB_EMULATOR_HOST: str | None = None
+    PULL_MAX_MESSAGES: int | None = None
+    PULL_MAX_BYTES: int = 64 * 1024 * 1024
+    PULL_ACK_DEADLINE_SECONDS: int = 60
+    PULL_MAX_LEASE_SECONDS: int = 3600
     VIDEO_OUTPUT_DIR: str | None = "/tmp/media"
+    RENDER_QUALITY: str = "low_quality"
+    PROGRESSIVE_RENDERING: bool = False
+    PROGRESSIVE_FINAL_QUALITY: str = "medium_quality"
+    PREVIEW_PIXEL_HEIGHT: int = 270
+    PREVIEW_FRAME_RATE: int = 10
+    MULTI_SCENE_OUTPUT: str = "concat"
+    ENCODING_PROFILE: str = "faststart"
+    ENCODING_CRF: int | None = None
+    ENCODING_PRESET: str | None = None
+    ENCODING_THREADS: int = 0
+    GIF_FRAME_RATE: int = 15
+    GIF_WIDTH: int = 480
+    POSTER_ENABLED: bool = True
+    SEGMENTED_RENDERING: bool = False
+    SEGMENT_MIN_ANIMATIONS: int = 6
+    RENDER_SCRATCH_DIR: str | None = None
+    RENDER_CONCURRENCY: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    RENDER_TIMEOUT_SECONDS: int = 600
+    RENDER_TIMEOUT_MIN_SECONDS: int = 60
+    RENDER_TIMEOUT_COST_HEADROOM: float = 5.0
+    RENDER_TIMEOUT_MIN_CALIBRATION_SAMPLES: int = 5
+    RENDER_MEMORY_LIMIT_MB: int | None = None
+    RENDER_FILE_SIZE_LIMIT_MB: int | None = 1024
+    RENDER_CPUS_PER_JOB: int | None = None
+    RENDER_WORKER_MAX_JOBS: int = 50
+    WORKSPACE_SWEEP_INTERVAL_SECONDS: int = 300
+    WORKSPACE_MAX_AGE_SECONDS: int = 2 * 60 * 60
+    MEDIA_CACHE_ENABLED: bool = True
+    MEDIA_CACHE_DIR: str = "/tmp/manim-cache"
+    MEDIA_CACHE_QUOTA_MB: int = 2048
+    STORAGE_BACKEND: str = "dropbox"
+    STORAGE_TIMEOUT_SECONDS: int = 60
+    LOCAL_STORAGE_DIR: str = "/tmp/videos"
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8090"
+    LOCAL_STORAGE_HOST: str = "0.0.0.0"
+    LOCAL_STORAGE_PORT: int = 8090
+    LOCAL_STORAGE_CACHE_MAX_AGE_SECONDS: int = 24 * 60 * 60
+    S3_ENDPOINT_URL: str | None = None
+    S3_BUCKET: str = "renders"
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = None
+    S3_PUBLIC_URL: str | None = None
+    UPLOAD_CHUNK_SIZE_MB: int = 8
+    UPLOAD_CONCURRENCY: int = 2
+    PIPELINE_RENDER_QUEUE_SIZE: int = 64
+    PIPELINE_UPLOAD_QUEUE_SIZE: int = 4
+    PIPELINE_NOTIFY_QUEUE_SIZE: int = 16
+    SCHEDULER_AGING_RATE: float = 1.0
+    SCHEDULER_PRIORITY_AGING_SECONDS: float | None = 120.0
+    FAIR_QUEUE_QUANTUM_SECONDS: float = 30.0
+    FAIR_QUEUE_STATS_MAX_USERS: int = 1000
+    RENDER_MAX_IN_FLIGHT_PER_USER: int | None = None
+    RENDER_COST_SECONDS_PER_UNIT: float = 2.0
+    RENDER_COST_CALIBRATION_ALPHA: float = 0.2
+    RENDER_CACHE_ENABLED: bool = True
+    RENDER_CACHE_PREFIX: str = "render_cache"
+    RENDER_CACHE_VERSION: str = "1"
+    RENDER_CACHE_TTL_SECONDS: int = 3 * 24 * 60 * 60
+    STORAGE_RETENTION_SECONDS: int = 4 * 24 * 60 * 60
+    RENDER_CACHE_MIN_LINK_LIFETIME_SECONDS: int = 2 * 24 * 60 * 60
+    RENDER_FAILURE_CACHE_TTL_SECONDS: int = 60 * 60
+    CANCEL_SUPERSEDED_RENDERS: bool = True
+    CANCEL_CHECK_INTERVAL_SECONDS: float = 2.0
+    LATEST_REQUEST_PREFIX: str = "latest_render_request"
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_LEASE_SECONDS: int = 60
+    SINGLEFLIGHT_POLL_SECONDS: float = 1.0
+    SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS: int = 900
+    PREFLIGHT_ENABLED: bool = True
+    PREFLIGHT_TIMEOUT_SECONDS: int = 30
+    CODE_STORE_ENABLED: bool = True
+    CODE_STORE_PREFIX: str = "render_code"
+    CODE_STORE_TTL_SECONDS: int = 7 * 24 * 60 * 60
 
     class Config:
         env_file =  ".env"
@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from rendering_service.core.config import settings
+
+_lock = threading.Lock()
+_seconds_per_unit: dict[str, float] = {}
+_samples: dict[str, int] = {}
+
+
+def seconds_per_unit(quality: str) -> float:
+    with _lock:
+        return _seconds_per_unit.get(quality, settings.RENDER_COST_SECONDS_PER_UNIT)
+
+
+def predict_seconds(cost: float, quality: str) -> float:
+    return max(cost, 0.0) * seconds_per_unit(quality)
+
+
+def time_limit(cost: float, quality: str) -> float:
+    with _lock:
+        samples = _samples.get(quality, 0)
+    if cost <= 0 or samples < settings.RENDER_TIMEOUT_MIN_CALIBRATION_SAMPLES:
+        return settings.RENDER_TIMEOUT_SECONDS
+    scaled = predict_seconds(cost, quality) * settings.RENDER_TIMEOUT_COST_HEADROOM
+    return min(
+        max(scaled, settings.RENDER_TIMEOUT_MIN_SECONDS),
+        settings.RENDER_TIMEOUT_SECONDS,
+    )
+
+
+def observe(quality: str, cost: float, seconds: float):
+    if cost <= 0 or seconds <= 0:
+        return
+    ratio = seconds / cost
+    alpha = settings.RENDER_COST_CALIBRATION_ALPHA
+    with _lock:
+        previous = _seconds_per_unit.get(quality)
+        _seconds_per_unit[quality] = (
+            ratio if previous is None else (1 - alpha) * previous + alpha * ratio
+        )
+        _samples[quality] = _samples.get(quality, 0) + 1
+        calibrated = _seconds_per_unit[quality]
+    logging.debug(
+        f"Render cost calibration for '{quality}': {calibrated:.3f}s per unit "
+        f"after observing {seconds:.2f}s for cost {cost:.1f}."
+    )
+
+
+def observe_timeout(quality: str, cost: float, seconds: float):
+    if cost <= 0 or seconds <= 0:
+        return
+    ratio = seconds / cost
+    with _lock:
+        previous = _seconds_per_unit.get(quality, settings.RENDER_COST_SECONDS_PER_UNIT)
+        if ratio <= previous:
+            return
+        _seconds_per_unit[quality] = ratio
+        _samples.setdefault(quality, 0)
+    logging.warning(
+        f"Render of cost {cost:.1f} at '{quality}' was killed after {seconds:.2f}s; "
+        f"raising its calibration to at least {ratio:.3f}s per unit."
+    )
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            quality: {"seconds_per_unit": ratio, "samples": _samples[quality]}
+            for quality, ratio in _seconds_per_unit.items()
+        }
@@ -0,0 +1,154 @@
+import logging
+import os
+import subprocess
+
+from rendering_service import metrics
+from rendering_service.core.config import settings
+from rendering_service.services import RenderError
+
+ENCODING_PROFILES = {
+    "faststart": {"format": "mp4"},
+    "web": {"format": "mp4", "crf": 23, "preset": "veryfast"},
+    "compact": {"format": "mp4", "crf": 28, "preset": "slow"},
+    "webm": {"format": "webm", "crf": 32},
+    "gif": {"format": "gif"},
+}
+
+
+def profile() -> dict:
+    if settings.ENCODING_PROFILE not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{settings.ENCODING_PROFILE}'.")
+    encoding = dict(ENCODING_PROFILES[settings.ENCODING_PROFILE])
+    if settings.ENCODING_CRF is not None and encoding["format"] != "gif":
+        encoding["crf"] = settings.ENCODING_CRF
+    if settings.ENCODING_PRESET and encoding["format"] == "mp4":
+        encoding["preset"] = settings.ENCODING_PRESET
+    return encoding
+
+
+def is_remux(encoding: dict) -> bool:
+    return encoding["format"] == "mp4" and "crf" not in encoding
+
+
+def _codec_arguments(encoding: dict) -> list[str]:
+    threads = ["-threads", str(settings.ENCODING_THREADS)]
+    if is_remux(encoding):
+        return ["-c", "copy", "-movflags", "+faststart"]
+    if encoding["format"] == "mp4":
+        return [
+            "-c:v",
+            "libx264",
+            "-preset",
+            encoding.get("preset", "veryfast"),
+            "-crf",
+            str(encoding["crf"]),
+            "-pix_fmt",
+            "yuv420p",
+            *threads,
+            "-c:a",
+            "aac",
+            "-movflags",
+            "+faststart",
+        ]
+    if encoding["format"] == "webm":
+        return [
+            "-c:v",
+            "libvpx-vp9",
+            "-crf",
+            str(encoding["crf"]),
+            "-b:v",
+            "0",
+            "-row-mt",
+            "1",
+            "-deadline",
+            "good",
+            "-cpu-used",
+            "4",
+            *threads,
+            "-c:a",
+            "libopus",
+        ]
+    return [
+        "-vf",
+        (
+            f"fps={settings.GIF_FRAME_RATE},scale={settings.GIF_WIDTH}:-1:"
+            "flags=lanczos,split[a][b];[a]palettegen[p];[b][p]paletteuse"
+        ),
+        "-loop",
+        "0",
+        "-an",
+    ]
+
+
+def encode_command(input_path: str, output_path: str, encoding: dict) -> list[str]:
+    return [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        input_path,
+        *_codec_arguments(encoding),
+        output_path,
+    ]
+
+
+def encode(video_path: str, faststart: bool = False) -> str:
+    encoding = profile()
+    if faststart and is_remux(encoding):
+        return video_path
+
+    output_path = f"{os.path.splitext(video_path)[0]}_encoded.{encoding['format']}"
+    try:
+        with metrics.timed_step("transcode"):
+            subprocess.run(
+                encode_command(video_path, output_path, encoding),
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=settings.RENDER_TIMEOUT_SECONDS,
+            )
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Encoding {video_path} failed:\n{e.stderr}")
+        raise RenderError("Failed to encode the rendered video.") from e
+    except subprocess.TimeoutExpired as e:
+        logging.error(f"Encoding {video_path} timed out after {e.timeout}s.")
+        raise RenderError("Failed to encode the rendered video.") from e
+    return output_path
+
+
+def poster_command(video_path: str, poster_path: str) -> list[str]:
+    return [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-sseof",
+        "-1",
+        "-i",
+        video_path,
+        "-update",
+        "1",
+        "-q:v",
+        "3",
+        poster_path,
+    ]
+
+
+def extract_poster(video_path: str) -> str | None:
+    if not settings.POSTER_ENABLED:
+        return None
+    poster_path = f"{os.path.splitext(video_path)[0]}_poster.jpg"
+    try:
+        with metrics.timed_step("poster"):
+            subprocess.run(
+                poster_command(video_path, poster_path),
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=60,
+            )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"Extracting a poster from {video_path} failed: {e}")
+        return None
+    return poster_path
@@ -1,17 +1,18 @@
 import base64
 import logging
-import os
-import shutil
+from concurrent.futures import Future
 from contextlib import asynccontextmanager
 from typing import Any
 
-from dropbox.exceptions import InternalServerError, RateLimitError
 from fastapi import FastAPI, HTTPException, Response
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
+from render_analysis import analysis, envelope
 
-from rendering_service import services
+from rendering_service import cost_model, metrics, services, workspace
+from rendering_service.consumer import PullConsumer
 from rendering_service.core.config import settings
+from rendering_service.pipeline import RenderJob, RenderPipeline
 
 
 class PubSubMessage(BaseModel):
@@ -28,12 +29,22 @@ class PushRequest(BaseModel):
 async def lifespan(app: FastAPI):
     logging.info("Application startup: Initializing services...")
     await services.initialize_services()
+    workspace.start_janitor()
+    render_pipeline.start()
+    if settings.CONSUMER_MODE == "pull":
+        pull_consumer.start()
     logging.info("Application startup: Services initialized.")
     yield
 
     logging.info("Application shutdown: Cleaning up resources.")
+    await run_in_threadpool(pull_consumer.stop)
+    await run_in_threadpool(render_pipeline.stop)
+    await services.shutdown_services()
+    workspace.stop_janitor()
 
 
+render_pipeline = RenderPipeline()
+
 app = FastAPI(
     title="Rendering Service",
     description="Accepts Pub/Sub push requests to render Manim videos.",
@@ -42,68 +53,84 @@ app = FastAPI(
 )
 
 
-def process_message(message: PubSubMessage) -> bool:
-    attributes = message.attributes
+def _flag(attributes: dict, name: str, default: bool) -> bool:
+    value = attributes.get(name)
+    if value is None:
+        return default
+    return str(value).lower() == "true"
+
+
+def _code_analysis(code: str, attributes: dict) -> dict | None:
+    code_analysis = analysis.from_attributes(attributes)
+    if code_analysis is not None:
+        return code_analysis
     try:
-        code_to_render = base64.b64decode(message.data).decode("utf-8").strip()
+        with metrics.timed_step("analyze"):
+            return analysis.analyze(code)
+    except SyntaxError:
+        return None
+
+
+def _decode_job(data: bytes, attributes: dict) -> tuple[str | None, dict | None]:
+    if not attributes.get(envelope.ENVELOPE_ATTRIBUTE):
+        metrics.MESSAGE_BYTES.labels(format="raw").observe(len(data))
+        return data.decode("utf-8").strip(), None
+    metrics.MESSAGE_BYTES.labels(format="envelope").observe(len(data))
+    body = envelope.decode(data)
+    code = body.get("code")
+    return code.strip() if code else None, body["analysis"]
+
+
+def submit_message(data: bytes, attributes: dict) -> Future | None:
+    try:
+        with metrics.timed_step("decode"):
+            code_to_render, code_analysis = _decode_job(data, attributes)
         job_id = attributes.get("job_id")
         user_id = attributes.get("user_id")
         source_id = attributes.get("source_id")
-        if not all([job_id, user_id, code_to_render]):
+        if not all([job_id, user_id, code_to_render or code_analysis]):
             raise ValueError(
                 "'job_id', 'user_id', and code data must be provided in attributes."
             )
     except (KeyError, TypeError, ValueError) as e:
         logging.error(f"Invalid message payload or attributes, will not retry: {e}")
-        return True
+        return None
 
     logging.info(f"Processing job_id '{job_id}' for user_id '{user_id}'.")
+    job = RenderJob(
+        job_id=job_id,
+        user_id=user_id,
+        code=code_to_render,
+        source_id=source_id,
+        source_type=attributes.get("source_type"),
+        request_timestamp=attributes.get("request_timestamp"),
+        attributes=attributes,
+    )
+    if _flag(attributes, "progressive", settings.PROGRESSIVE_RENDERING):
+        job.quality = services.PREVIEW_QUALITY
+        job.variant = "preview"
+    if attributes.get("scene_output") in ("separate", "concat"):
+        job.scene_output = attributes["scene_output"]
+    if _flag(attributes, "segmented", settings.SEGMENTED_RENDERING):
+        job.segments = settings.RENDER_CONCURRENCY
+    job.code_analysis = code_analysis or _code_analysis(code_to_render, attributes)
+    if job.code_analysis:
+        job.render_cost = job.code_analysis["cost"]
+    return render_pipeline.submit(job)
+
+
+pull_consumer = PullConsumer(submit_message)
 
-    redis_payload = {}
-    final_status = "failure"
 
+def process_message(message: PubSubMessage) -> bool:
     try:
-        scene_name = services.extract_first_scene_name(code_to_render)
-        video_file_path = services.render_video(code_to_render, scene_name)
-        dropbox_link = services.upload_and_get_link(
-            video_file_path, source_id, job_id, scene_name
-        )
-        final_status = "success"
-        redis_payload = {
-            "job_id": job_id,
-            "user_id": user_id,
-            "status": final_status,
-            "video_url": dropbox_link,
-            "source_id": source_id,
-            "source_type": attributes.get("source_type"),
-            "request_timestamp": attributes.get("request_timestamp"),
-        }
-        return True
-    except (InternalServerError, RateLimitError) as e:
-        logging.warning(f"Job '{job_id}' failed with a retryable Dropbox error: {e}")
-        return False
-
-    except Exception as e:
-        logging.error(
-            f"Job '{job_id}' failed with a non-retryable error: {e}", exc_info=True
-        )
-        redis_payload = {
-            "job_id": job_id,
-            "user_id": user_id,
-            "status": "failure",
-            "error": str(e),
-            "source_id": source_id,
-            "source_type": attributes.get("source_type"),
-            "request_timestamp": attributes.get("request_timestamp"),
-        }
+        with metrics.timed_step("base64_decode"):
+            data = base64.b64decode(message.data)
+    except ValueError as e:
+        logging.error(f"Invalid message payload or attributes, will not retry: {e}")
         return True
-
-    finally:
-        if redis_payload:
-            services.publish_redis_message(redis_payload)
-        if os.path.exists(settings.VIDEO_OUTPUT_DIR):
-            shutil.rmtree(settings.VIDEO_OUTPUT_DIR)
-            logging.info(f"Cleaned up temporary directory: {settings.VIDEO_OUTPUT_DIR}")
+    done = submit_message(data, message.attributes)
+    return True if done is None else done.result()
 
 
 @app.post("/")
@@ -121,3 +148,22 @@ async def pubsub_push_endpoint(request: PushRequest):
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "message": "Rendering-service is running."}
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "pipeline": render_pipeline.stats(),
+        "render_pool": services.render_pool.stats() if services.render_pool else None,
+        "publisher": services.publisher.stats(),
+        "cost_model": cost_model.stats(),
+    }
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    metrics.update_pool_gauges(
+        services.render_pool.stats() if services.render_pool else None
+    )
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
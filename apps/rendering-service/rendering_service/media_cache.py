@@ -0,0 +1,86 @@
+import logging
+import os
+import shutil
+import threading
+from collections import Counter
+
+from rendering_service.core.config import settings
+
+_lock = threading.Lock()
+_in_use: Counter[str] = Counter()
+
+
+def _sources_root() -> str:
+    return os.path.join(settings.MEDIA_CACHE_DIR, "sources")
+
+
+def _source_dir(source_id: str) -> str:
+    return os.path.join(_sources_root(), os.path.basename(source_id))
+
+
+def tex_dir() -> str:
+    path = os.path.join(settings.MEDIA_CACHE_DIR, "tex")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def acquire(source_id: str) -> str:
+    path = _source_dir(source_id)
+    with _lock:
+        _in_use[source_id] += 1
+        os.makedirs(path, exist_ok=True)
+        os.utime(path)
+    return path
+
+
+def release(source_id: str):
+    with _lock:
+        _in_use[source_id] -= 1
+        if _in_use[source_id] <= 0:
+            del _in_use[source_id]
+    enforce_quota()
+
+
+def render_overrides(source_id: str | None, partition: str | None = None) -> dict:
+    if not settings.MEDIA_CACHE_ENABLED:
+        return {}
+    overrides = {"tex_dir": tex_dir()}
+    if source_id:
+        scene_dir = f"{{scene_name}}_{partition}" if partition else "{scene_name}"
+        overrides["partial_movie_dir"] = os.path.join(
+            _source_dir(source_id), "partial_movie_files", scene_dir
+        )
+    return overrides
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+    return total
+
+
+def enforce_quota():
+    root = _sources_root()
+    if not os.path.isdir(root):
+        return
+    quota = settings.MEDIA_CACHE_QUOTA_MB * 1024 * 1024
+    with _lock:
+        entries = []
+        for entry in os.scandir(root):
+            if entry.is_dir():
+                size = _dir_size(entry.path)
+                entries.append((entry.stat().st_mtime, entry.name, entry.path, size))
+        total = sum(size for *_, size in entries) + _dir_size(tex_dir())
+        for _, source_id, path, size in sorted(entries):
+            if total <= quota:
+                break
+            if _in_use[source_id]:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            logging.info(f"Evicted render cache for source '{source_id}'.")
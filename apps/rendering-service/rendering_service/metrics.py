@@ -0,0 +1,108 @@
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+)
+
+STEP_SECONDS = Histogram(
+    "rendering_step_seconds",
+    "Time spent in each step of a render job.",
+    ["step", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_WAIT_SECONDS = Histogram(
+    "rendering_stage_wait_seconds",
+    "Time a job waited in a pipeline stage queue.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "rendering_stage_seconds",
+    "Time a job spent being processed by a pipeline stage.",
+    ["stage", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+JOB_SECONDS = Histogram(
+    "rendering_job_seconds",
+    "End-to-end time from submission to completion of a render job.",
+    ["variant", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+JOB_CPU_SECONDS = Histogram(
+    "rendering_job_cpu_seconds",
+    "CPU time spent by render processes on a render job.",
+    ["variant", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+MESSAGE_BYTES = Histogram(
+    "rendering_message_bytes",
+    "Size of render job messages as received.",
+    ["format"],
+    buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 262144),
+)
+RENDER_LIMIT_EXCEEDED = Counter(
+    "rendering_limit_exceeded_total",
+    "Render processes stopped for exceeding a resource limit.",
+    ["limit"],
+)
+JOBS_IN_FLIGHT = Gauge(
+    "rendering_jobs_in_flight", "Render jobs submitted but not yet completed."
+)
+RENDER_POOL_SIZE = Gauge("rendering_pool_size", "Render worker processes.")
+RENDER_POOL_BUSY = Gauge("rendering_pool_busy", "Render workers running a job.")
+RENDER_POOL_UTILIZATION = Gauge(
+    "rendering_pool_utilization", "Fraction of render workers running a job."
+)
+
+
+def observe_step(step: str, seconds: float, outcome: str = "success"):
+    STEP_SECONDS.labels(step=step, outcome=outcome).observe(seconds)
+
+
+@contextmanager
+def timed_step(step: str):
+    started = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        observe_step(step, time.perf_counter() - started, outcome)
+
+
+def update_pool_gauges(pool_stats: dict | None):
+    if not pool_stats:
+        return
+    RENDER_POOL_SIZE.set(pool_stats["size"])
+    RENDER_POOL_BUSY.set(pool_stats["busy"])
+    RENDER_POOL_UTILIZATION.set(pool_stats["busy"] / max(pool_stats["size"], 1))
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
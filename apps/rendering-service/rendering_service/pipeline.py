@@ -0,0 +1,556 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+
+from dropbox.exceptions import InternalServerError, RateLimitError
+
+from rendering_service import (
+    cancellation,
+    code_store,
+    cost_model,
+    encoding,
+    media_cache,
+    metrics,
+    render_cache,
+    services,
+    singleflight,
+    storage,
+    workspace,
+)
+from rendering_service.core.config import settings
+from rendering_service.progress import ProgressReporter
+from rendering_service.scheduler import FairJobQueue
+from rendering_service.singleflight import Lease
+from rendering_service.worker_pool import RenderCancelledError, RenderTimeoutError
+
+RETRYABLE_ERRORS = (
+    InternalServerError,
+    RateLimitError,
+    storage.TransientStorageError,
+)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_cpu_lock = threading.Lock()
+
+
+@dataclass(eq=False)
+class RenderJob:
+    job_id: str
+    user_id: str
+    code: str | None
+    source_id: str | None = None
+    source_type: str | None = None
+    request_timestamp: str | None = None
+    attributes: dict = field(default_factory=dict)
+    quality: str = field(default_factory=lambda: settings.RENDER_QUALITY)
+    variant: str = "final"
+    priority: int = PRIORITY_INTERACTIVE
+    scene_output: str = field(default_factory=lambda: settings.MULTI_SCENE_OUTPUT)
+    segments: int = 1
+    render_cost: float = 0.0
+    code_analysis: dict | None = None
+    scene_names: list[str] = field(default_factory=list)
+    scene_name: str | None = None
+    cache_key: str | None = None
+    lease: Lease | None = None
+    workspace: str | None = None
+    video_paths: list[str] = field(default_factory=list)
+    video_path: str | None = None
+    poster_path: str | None = None
+    video_url: str | None = None
+    video_urls: list[dict] | None = None
+    poster_url: str | None = None
+    error: str | None = None
+    superseded: bool = False
+    preflighted: bool = False
+    cpu_seconds: float = 0.0
+    acknowledge: bool = True
+    done: Future = field(default_factory=Future)
+    submitted_at: float = field(default_factory=time.monotonic)
+    stage_entered_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def outcome(self) -> str:
+        if not self.acknowledge:
+            return "retry"
+        if self.superseded:
+            return "superseded"
+        if self.error is not None:
+            return "error"
+        return "success"
+
+    @property
+    def resolved(self) -> bool:
+        return self.superseded or self.video_url is not None or self.error is not None
+
+    @property
+    def has_followup(self) -> bool:
+        return self.variant == "preview" and self.outcome == "success"
+
+    @property
+    def renders_separately(self) -> bool:
+        return len(self.scene_names) > 1 and self.scene_output == "separate"
+
+    @property
+    def scene_key(self) -> str:
+        if len(self.scene_names) == 1:
+            return self.scene_names[0]
+        return f"{'+'.join(self.scene_names)}|{self.scene_output}"
+
+    def final_followup(self) -> "RenderJob":
+        return replace(
+            self,
+            quality=settings.PROGRESSIVE_FINAL_QUALITY,
+            variant="final",
+            priority=PRIORITY_BACKGROUND,
+            cache_key=None,
+            lease=None,
+            workspace=None,
+            video_paths=[],
+            video_path=None,
+            poster_path=None,
+            video_url=None,
+            video_urls=None,
+            poster_url=None,
+            error=None,
+            cpu_seconds=0.0,
+            stage_entered_at=time.monotonic(),
+        )
+
+    def redis_payload(self) -> dict:
+        payload = {
+            "job_id": self.job_id,
+            "user_id": self.user_id,
+            "source_id": self.source_id,
+            "source_type": self.source_type,
+            "request_timestamp": self.request_timestamp,
+            "variant": self.variant,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+        }
+        if self.superseded:
+            payload["status"] = "superseded"
+        elif self.error is None:
+            payload.update(status="success", video_url=self.video_url)
+            if self.video_urls:
+                payload["video_urls"] = self.video_urls
+            if self.poster_url:
+                payload["poster_url"] = self.poster_url
+        else:
+            payload.update(status="failure", error=self.error)
+        return payload
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[RenderJob], None],
+        workers: int,
+        maxsize: int,
+        job_queue: FairJobQueue | None = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: queue.Queue[RenderJob | None] | FairJobQueue = (
+            job_queue or queue.Queue(maxsize=maxsize)
+        )
+        self.pipeline: RenderPipeline | None = None
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._processed = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._max_run_seconds = 0.0
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"{self.name}-stage-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=30)
+        self._threads = []
+
+    def put(self, job: RenderJob):
+        job.stage_entered_at = time.monotonic()
+        self.queue.put(job)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            started = time.monotonic()
+            metrics.STAGE_WAIT_SECONDS.labels(stage=self.name).observe(
+                started - job.stage_entered_at
+            )
+            with self._lock:
+                self._busy += 1
+                self._wait_seconds += started - job.stage_entered_at
+            outcome = "success"
+            try:
+                self.handler(job)
+            except RETRYABLE_ERRORS as e:
+                outcome = "retry"
+                logging.warning(
+                    f"Job '{job.job_id}' failed with a retryable storage error: {e}"
+                )
+                job.acknowledge = False
+                job.error = str(e)
+            except Exception as e:
+                logging.error(
+                    f"Job '{job.job_id}' failed with a non-retryable error: {e}",
+                    exc_info=True,
+                )
+                outcome = "error"
+                job.error = str(e)
+                if job.cache_key and isinstance(e, services.RenderError):
+                    render_cache.store_failure(job.cache_key, job.error)
+            finally:
+                if isinstance(self.queue, FairJobQueue):
+                    self.queue.release(job)
+                elapsed = time.monotonic() - started
+                metrics.STAGE_SECONDS.labels(stage=self.name, outcome=outcome).observe(
+                    elapsed
+                )
+                with self._lock:
+                    self._busy -= 1
+                    self._processed += 1
+                    self._run_seconds += elapsed
+                    self._max_run_seconds = max(self._max_run_seconds, elapsed)
+            self.pipeline.advance(self, job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            processed = self._processed or 1
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "processed": self._processed,
+                "avg_wait_seconds": self._wait_seconds / processed,
+                "avg_latency_seconds": self._run_seconds / processed,
+                "max_latency_seconds": self._max_run_seconds,
+            }
+
+
+def _supersede(job: RenderJob):
+    logging.info(
+        f"Job '{job.job_id}' was superseded by a newer request for "
+        f"{job.source_type} '{job.source_id}'."
+    )
+    job.superseded = True
+
+
+def _charge_cpu(job: RenderJob, seconds: float):
+    with _cpu_lock:
+        job.cpu_seconds += seconds
+
+
+def _load_code(job: RenderJob):
+    code_hash = job.code_analysis["code_hash"]
+    with metrics.timed_step("code_fetch"):
+        job.code = code_store.fetch(code_hash)
+    if job.code is None:
+        raise services.RenderError(
+            "The code for this render is no longer available, please submit it again."
+        )
+
+
+def _prepare_cache_key(job: RenderJob) -> bool:
+    if job.code_analysis is None or not job.code_analysis["scene_names"]:
+        return False
+    if not job.scene_names:
+        job.scene_names = job.code_analysis["scene_names"]
+    job.scene_name = job.scene_names[0]
+    job.cache_key = render_cache.make_cache_key(
+        job.code_analysis["code_hash"], job.scene_key, job.quality
+    )
+    return True
+
+
+def _apply_cached(job: RenderJob, cached: dict | None) -> bool:
+    if cached and cached.get("status") == "failure":
+        logging.info(f"Job '{job.job_id}' matches a cached render failure.")
+        job.cache_key = None
+        job.error = cached.get("error", "Render failed.")
+        return True
+    if cached and cached.get("video_url"):
+        logging.info(f"Job '{job.job_id}' served from render cache.")
+        job.video_url = cached["video_url"]
+        job.video_urls = cached.get("video_urls")
+        job.poster_url = cached.get("poster_url")
+        return True
+    return False
+
+
+def serve_from_cache(job: RenderJob) -> bool:
+    if not _prepare_cache_key(job):
+        return False
+    with metrics.timed_step("cache_lookup"):
+        cached = render_cache.lookup(job.cache_key)
+    return _apply_cached(job, cached)
+
+
+def render_stage(job: RenderJob):
+    if cancellation.is_superseded(job):
+        _supersede(job)
+        return
+    hash_only = job.code is None
+    if hash_only:
+        _load_code(job)
+    if job.code_analysis is None or not job.code_analysis["scene_names"]:
+        job.code_analysis = services.analyze_code(job.code)
+    if not hash_only:
+        code_store.remember(job.code_analysis["code_hash"], job.code)
+    if job.cache_key is None:
+        _prepare_cache_key(job)
+
+    job.workspace = workspace.create_job_workspace(job.job_id)
+    options = services.RenderOptions(
+        segments=job.segments,
+        should_cancel=lambda: cancellation.is_superseded(job),
+        on_cpu_seconds=lambda seconds: _charge_cpu(job, seconds),
+        time_limit=cost_model.time_limit(job.render_cost, job.quality),
+    )
+    animation_counts = job.code_analysis["animation_counts"]
+    if settings.PREFLIGHT_ENABLED and not job.preflighted:
+        try:
+            animation_counts = services.preflight_scenes(
+                job.code, job.scene_names, job.workspace, options
+            )
+        except RenderCancelledError:
+            _supersede(job)
+            return
+        job.preflighted = True
+        options.animation_counts = animation_counts
+    options.on_progress = ProgressReporter(
+        job,
+        sum(animation_counts.get(scene_name, 0) for scene_name in job.scene_names),
+    )
+
+    cache_source = job.source_id if settings.MEDIA_CACHE_ENABLED else None
+    options.source_id = cache_source
+    if cache_source:
+        media_cache.acquire(cache_source)
+    started = time.monotonic()
+    try:
+        job.video_paths = services.render_scenes(
+            job.code, job.scene_names, job.workspace, job.quality, options
+        )
+        cost_model.observe(job.quality, job.render_cost, time.monotonic() - started)
+    except RenderCancelledError:
+        _supersede(job)
+        return
+    except RenderTimeoutError:
+        cost_model.observe_timeout(
+            job.quality, job.render_cost, time.monotonic() - started
+        )
+        raise
+    finally:
+        if cache_source:
+            media_cache.release(cache_source)
+
+    concatenated = len(job.video_paths) > 1 and not job.renders_separately
+    if concatenated:
+        job.video_path = services.concatenate_videos(
+            job.video_paths, os.path.join(job.workspace, "combined.mp4")
+        )
+    else:
+        job.video_path = job.video_paths[0]
+
+    job.poster_path = encoding.extract_poster(job.video_path)
+    if job.renders_separately:
+        job.video_paths = [encoding.encode(path) for path in job.video_paths]
+        job.video_path = job.video_paths[0]
+    else:
+        job.video_path = encoding.encode(job.video_path, faststart=concatenated)
+
+
+def _upload_label(job: RenderJob, scene_name: str) -> str:
+    if job.variant == "final":
+        return scene_name
+    return f"{scene_name}_{job.variant}"
+
+
+def upload_stage(job: RenderJob):
+    if cancellation.is_superseded(job):
+        _supersede(job)
+        return
+    if job.poster_path:
+        job.poster_url = services.upload_and_get_link(
+            job.poster_path,
+            job.source_id,
+            job.job_id,
+            f"{_upload_label(job, job.scene_name)}_poster",
+        )
+    if job.renders_separately:
+        job.video_urls = [
+            {
+                "scene_name": scene_name,
+                "video_url": services.upload_and_get_link(
+                    path, job.source_id, job.job_id, _upload_label(job, scene_name)
+                ),
+            }
+            for scene_name, path in zip(job.scene_names, job.video_paths, strict=True)
+        ]
+        job.video_url = job.video_urls[0]["video_url"]
+    else:
+        job.video_url = services.upload_and_get_link(
+            job.video_path,
+            job.source_id,
+            job.job_id,
+            _upload_label(job, job.scene_name),
+        )
+    render_cache.store_success(
+        job.cache_key, job.video_url, job.video_urls, job.poster_url
+    )
+    _release_lease(job)
+
+
+def _release_lease(job: RenderJob):
+    if job.lease:
+        job.lease.release()
+        job.lease = None
+
+
+def notify_stage(job: RenderJob):
+    if job.acknowledge:
+        services.publish_redis_message(job.redis_payload())
+
+
+class RenderPipeline:
+    def __init__(self):
+        self.render = Stage(
+            "render",
+            render_stage,
+            workers=settings.RENDER_CONCURRENCY,
+            maxsize=settings.PIPELINE_RENDER_QUEUE_SIZE,
+            job_queue=FairJobQueue(maxsize=settings.PIPELINE_RENDER_QUEUE_SIZE),
+        )
+        self.upload = Stage(
+            "upload",
+            upload_stage,
+            workers=settings.UPLOAD_CONCURRENCY,
+            maxsize=settings.PIPELINE_UPLOAD_QUEUE_SIZE,
+        )
+        self.notify = Stage(
+            "notify",
+            notify_stage,
+            workers=1,
+            maxsize=settings.PIPELINE_NOTIFY_QUEUE_SIZE,
+        )
+        self.stages = [self.render, self.upload, self.notify]
+        for stage in self.stages:
+            stage.pipeline = self
+        self.waiting_room = singleflight.WaitingRoom(self._resume)
+        self._started = False
+
+    def start(self):
+        if self._started:
+            return
+        for stage in self.stages:
+            stage.start()
+        self.waiting_room.start()
+        self._started = True
+        logging.info("Render pipeline started.")
+
+    def stop(self):
+        if not self._started:
+            return
+        self.waiting_room.stop()
+        for stage in self.stages:
+            stage.stop()
+        self._started = False
+        logging.info("Render pipeline stopped.")
+
+    def submit(self, job: RenderJob) -> Future:
+        metrics.JOBS_IN_FLIGHT.inc()
+        self._route(job, self.render.put, self.notify.put)
+        return job.done
+
+    def _route(
+        self,
+        job: RenderJob,
+        render: Callable[[RenderJob], None],
+        deliver: Callable[[RenderJob], None],
+    ):
+        if serve_from_cache(job):
+            deliver(job)
+            return
+        if not job.cache_key or not singleflight.enabled():
+            render(job)
+            return
+        job.lease, cached = singleflight.try_lead(job.cache_key)
+        if job.lease:
+            render(job)
+        elif _apply_cached(job, cached):
+            deliver(job)
+        else:
+            logging.info(
+                f"Job '{job.job_id}' waits for an identical render in progress."
+            )
+            self.waiting_room.park(job.cache_key, job)
+
+    def _resume(self, job: RenderJob, lease: Lease | None, cached: dict | None):
+        if _apply_cached(job, cached):
+            self.notify.put(job)
+            return
+        job.lease = lease
+        job.stage_entered_at = time.monotonic()
+        self.render.queue.put_unbounded(job)
+
+    def _deliver_now(self, job: RenderJob):
+        notify_stage(job)
+        self._finish(job)
+
+    def advance(self, stage: Stage, job: RenderJob):
+        if stage is self.notify:
+            self._finish(job)
+        elif job.resolved or stage is self.upload:
+            self.notify.put(job)
+        else:
+            self.upload.put(job)
+
+    def _finish(self, job: RenderJob):
+        _release_lease(job)
+        if job.workspace:
+            workspace.release_workspace(job.workspace)
+        metrics.JOB_SECONDS.labels(variant=job.variant, outcome=job.outcome).observe(
+            time.monotonic() - job.submitted_at
+        )
+        metrics.JOB_CPU_SECONDS.labels(
+            variant=job.variant, outcome=job.outcome
+        ).observe(job.cpu_seconds)
+        if job.has_followup:
+            self._route(
+                job.final_followup(),
+                self.render.queue.put_unbounded,
+                self._deliver_now,
+            )
+            return
+        metrics.JOBS_IN_FLIGHT.dec()
+        job.done.set_result(job.acknowledge)
+
+    def stats(self) -> dict:
+        return {
+            **{stage.name: stage.stats() for stage in self.stages},
+            "users": self.render.queue.user_stats(),
+            "singleflight_waiting": self.waiting_room.size(),
+        }
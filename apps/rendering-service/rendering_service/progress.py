@@ -0,0 +1,46 @@
+import threading
+import time
+
+from rendering_service import services
+from rendering_service.core.config import settings
+
+
+class ProgressReporter:
+    def __init__(self, job, total_animations: int):
+        self.job = job
+        self.total_animations = max(total_animations, 1)
+        self.completed = 0
+        self.started = time.monotonic()
+        self._last_published = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        if event.get("skipped"):
+            return
+        with self._lock:
+            self.completed += 1
+            now = time.monotonic()
+            if now - self._last_published < settings.PROGRESS_MIN_INTERVAL_SECONDS:
+                return
+            self._last_published = now
+            completed = self.completed
+
+        fraction = min(completed / self.total_animations, 0.99)
+        elapsed = now - self.started
+        services.publish_progress_message(
+            {
+                "type": "progress",
+                "job_id": self.job.job_id,
+                "user_id": self.job.user_id,
+                "source_id": self.job.source_id,
+                "source_type": self.job.source_type,
+                "request_timestamp": self.job.request_timestamp,
+                "variant": self.job.variant,
+                "scene_name": event.get("scene_name"),
+                "animation": event.get("animation"),
+                "animation_index": completed,
+                "total_animations": self.total_animations,
+                "percent": round(fraction * 100, 1),
+                "eta_seconds": round(elapsed / fraction - elapsed, 1),
+            }
+        )
@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import deque
+
+from redis.exceptions import RedisError
+
+from rendering_service import metrics
+from rendering_service.core.config import settings
+
+
+class RedisPublisher:
+    def __init__(self):
+        self.client = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._buffer: deque[tuple[str, str, bool]] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._sending = 0
+        self.published = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    async def start(self, client):
+        self.client = client
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._drain())
+
+    async def stop(self, timeout: float = 10.0):
+        if not self._task:
+            return
+        await asyncio.sleep(0)
+        deadline = time.monotonic() + timeout
+        while (self._buffer or self._sending) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._buffer:
+            logging.error(
+                f"Discarding {len(self._buffer)} unpublished Redis messages "
+                "on shutdown."
+            )
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        await self.client.aclose()
+        self._task = None
+        self._loop = None
+        self.client = None
+
+    def publish(self, channel: str, message: dict, durable: bool = True) -> bool:
+        if self._loop is None:
+            return False
+        payload = json.dumps(message)
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, channel, payload, durable)
+        except RuntimeError:
+            return False
+        return True
+
+    def _enqueue(self, channel: str, payload: str, durable: bool):
+        if len(self._buffer) >= settings.REDIS_PUBLISH_BUFFER_SIZE:
+            self._drop_oldest()
+        self._buffer.append((channel, payload, durable))
+        self._wakeup.set()
+
+    def _drop_oldest(self):
+        for index, (_, _, durable) in enumerate(self._buffer):
+            if not durable:
+                del self._buffer[index]
+                break
+        else:
+            channel, _, _ = self._buffer.popleft()
+            logging.error(
+                f"Redis publish buffer is full, dropped a result for '{channel}'."
+            )
+        self.dropped += 1
+
+    async def _drain(self):
+        backoff = settings.REDIS_PUBLISH_RETRY_BASE_SECONDS
+        while True:
+            if not self._buffer:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            batch_size = min(len(self._buffer), settings.REDIS_PUBLISH_BATCH_SIZE)
+            batch = [self._buffer.popleft() for _ in range(batch_size)]
+            self._sending = batch_size
+            started = time.perf_counter()
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for channel, payload, _ in batch:
+                        pipe.publish(channel, payload)
+                    await pipe.execute()
+            except (RedisError, OSError) as e:
+                metrics.observe_step("publish", time.perf_counter() - started, "error")
+                retained = [item for item in batch if item[2]]
+                self.dropped += len(batch) - len(retained)
+                self._buffer.extendleft(reversed(retained))
+                self._sending = 0
+                self.failed_batches += 1
+                logging.warning(
+                    f"Publishing {len(batch)} Redis messages failed, "
+                    f"retrying in {backoff:.1f}s: {e}"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, settings.REDIS_PUBLISH_RETRY_MAX_SECONDS)
+                continue
+
+            metrics.observe_step("publish", time.perf_counter() - started)
+            self._sending = 0
+            backoff = settings.REDIS_PUBLISH_RETRY_BASE_SECONDS
+            self.published += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "published": self.published,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import time
+
+from rendering_service import encoding, services
+from rendering_service.core.config import settings
+
+
+def make_cache_key(code_hash: str, scene_name: str, quality: str) -> str:
+    digest = hashlib.sha256()
+    for part in (
+        settings.RENDER_CACHE_VERSION,
+        code_hash,
+        scene_name,
+        json.dumps(services.render_config(quality), sort_keys=True),
+        json.dumps(encoding.profile(), sort_keys=True),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"{settings.RENDER_CACHE_PREFIX}:{digest.hexdigest()}"
+
+
+def lookup(cache_key: str) -> dict | None:
+    if not settings.RENDER_CACHE_ENABLED or not services.redis_client:
+        return None
+    try:
+        cached = services.redis_client.get(cache_key)
+    except Exception as e:
+        logging.warning(f"Render cache lookup failed for '{cache_key}': {e}")
+        return None
+    if not cached:
+        return None
+    try:
+        entry = json.loads(cached)
+    except json.JSONDecodeError:
+        logging.warning(f"Discarding malformed render cache entry '{cache_key}'.")
+        return None
+    if entry.get("status") == "success" and _link_lifetime(entry) < (
+        settings.RENDER_CACHE_MIN_LINK_LIFETIME_SECONDS
+    ):
+        logging.info(f"Render cache entry '{cache_key}' expires too soon to reuse.")
+        return None
+    return entry
+
+
+def _link_lifetime(entry: dict) -> float:
+    uploaded_at = entry.get("uploaded_at")
+    if uploaded_at is None:
+        return 0.0
+    return uploaded_at + settings.STORAGE_RETENTION_SECONDS - time.time()
+
+
+def _store(cache_key: str, entry: dict, ttl_seconds: int):
+    if not settings.RENDER_CACHE_ENABLED or not services.redis_client:
+        return
+    try:
+        services.redis_client.set(cache_key, json.dumps(entry), ex=ttl_seconds)
+    except Exception as e:
+        logging.warning(f"Render cache store failed for '{cache_key}': {e}")
+
+
+def store_success(
+    cache_key: str,
+    video_url: str,
+    video_urls: list[dict] | None = None,
+    poster_url: str | None = None,
+):
+    entry = {"status": "success", "video_url": video_url, "uploaded_at": time.time()}
+    if video_urls:
+        entry["video_urls"] = video_urls
+    if poster_url:
+        entry["poster_url"] = poster_url
+    reusable_seconds = (
+        settings.STORAGE_RETENTION_SECONDS
+        - settings.RENDER_CACHE_MIN_LINK_LIFETIME_SECONDS
+    )
+    ttl_seconds = min(settings.RENDER_CACHE_TTL_SECONDS, reusable_seconds)
+    if ttl_seconds > 0:
+        _store(cache_key, entry, ttl_seconds)
+
+
+def store_failure(cache_key: str, error: str):
+    _store(
+        cache_key,
+        {"status": "failure", "error": error},
+        settings.RENDER_FAILURE_CACHE_TTL_SECONDS,
+    )
@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING
+
+from rendering_service import cost_model
+from rendering_service.core.config import settings
+
+if TYPE_CHECKING:
+    from rendering_service.pipeline import RenderJob
+
+
+def job_sort_key(job: "RenderJob") -> tuple[int, float]:
+    return (
+        job.priority,
+        cost_model.predict_seconds(job.render_cost, job.quality)
+        + settings.SCHEDULER_AGING_RATE * job.stage_entered_at,
+    )
+
+
+def max_in_flight_per_user() -> float:
+    return settings.RENDER_MAX_IN_FLIGHT_PER_USER or float("inf")
+
+
+class _DeficitRoundRobin:
+    def __init__(self):
+        self.queues: dict[str, list] = {}
+        self.active: deque[str] = deque()
+        self.deficit: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def push(self, user: str, entry: tuple):
+        user_queue = self.queues.setdefault(user, [])
+        if not user_queue:
+            self.active.append(user)
+            self.deficit.setdefault(user, 0.0)
+        heapq.heappush(user_queue, entry)
+
+    def oldest_entered_at(self) -> float:
+        return min(
+            entry[-1].stage_entered_at
+            for user_queue in self.queues.values()
+            for entry in user_queue
+        )
+
+    def pop(
+        self, in_flight: dict[str, int], cap: float, job_cost
+    ) -> "RenderJob | None":
+        if not any(in_flight.get(user, 0) < cap for user in self.active):
+            return None
+        while True:
+            user = self.active[0]
+            if in_flight.get(user, 0) >= cap:
+                self.active.rotate(-1)
+                continue
+            user_queue = self.queues[user]
+            cost = job_cost(user_queue[0][-1])
+            if self.deficit[user] < cost:
+                self.deficit[user] += settings.FAIR_QUEUE_QUANTUM_SECONDS
+                self.active.rotate(-1)
+                continue
+            job = heapq.heappop(user_queue)[-1]
+            self.deficit[user] -= cost
+            if not user_queue:
+                self.active.popleft()
+                del self.queues[user]
+                del self.deficit[user]
+            return job
+
+
+class FairJobQueue:
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self._sequence = itertools.count()
+        self._classes: dict[int, _DeficitRoundRobin] = {}
+        self._in_flight: dict[str, int] = {}
+        self._wait_stats: OrderedDict[str, dict] = OrderedDict()
+        self._size = 0
+        self._sentinels = 0
+
+    def qsize(self) -> int:
+        with self.mutex:
+            return self._size
+
+    def put(self, job: "RenderJob | None"):
+        with self.not_full:
+            if job is not None:
+                while self.maxsize > 0 and self._size >= self.maxsize:
+                    self.not_full.wait()
+            self._put(job)
+
+    def put_unbounded(self, job: "RenderJob"):
+        with self.mutex:
+            self._put(job)
+
+    def _put(self, job: "RenderJob | None"):
+        if job is None:
+            self._sentinels += 1
+        else:
+            priority_class = self._classes.setdefault(
+                job.priority, _DeficitRoundRobin()
+            )
+            priority_class.push(
+                job.user_id, (*job_sort_key(job), next(self._sequence), job)
+            )
+            self._size += 1
+        self.not_empty.notify_all()
+
+    def get(self) -> "RenderJob | None":
+        with self.not_empty:
+            while True:
+                job = self._next_job()
+                if job is not None:
+                    self.not_full.notify()
+                    return job
+                if self._sentinels:
+                    self._sentinels -= 1
+                    return None
+                self.not_empty.wait()
+
+    def _job_cost(self, job: "RenderJob") -> float:
+        return max(cost_model.predict_seconds(job.render_cost, job.quality), 1.0)
+
+    def _service_order(self) -> list[int]:
+        priorities = sorted(p for p, queued in self._classes.items() if queued)
+        aging = settings.SCHEDULER_PRIORITY_AGING_SECONDS
+        if aging is None:
+            return priorities
+        now = time.monotonic()
+        aged = [
+            priority
+            for priority in priorities
+            if now - self._classes[priority].oldest_entered_at() >= aging
+        ]
+        return aged + [priority for priority in priorities if priority not in aged]
+
+    def _next_job(self) -> "RenderJob | None":
+        cap = max_in_flight_per_user()
+        for priority in self._service_order():
+            job = self._classes[priority].pop(self._in_flight, cap, self._job_cost)
+            if job is None:
+                continue
+            self._size -= 1
+            self._in_flight[job.user_id] = self._in_flight.get(job.user_id, 0) + 1
+            self._record_wait(job.user_id, time.monotonic() - job.stage_entered_at)
+            return job
+        return None
+
+    def _record_wait(self, user: str, seconds: float):
+        stats = self._wait_stats.pop(user, None) or {
+            "jobs": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+        stats["jobs"] += 1
+        stats["total_wait_seconds"] += seconds
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], seconds)
+        self._wait_stats[user] = stats
+        while len(self._wait_stats) > settings.FAIR_QUEUE_STATS_MAX_USERS:
+            self._wait_stats.popitem(last=False)
+
+    def release(self, job: "RenderJob"):
+        with self.mutex:
+            remaining = self._in_flight.get(job.user_id, 0) - 1
+            if remaining > 0:
+                self._in_flight[job.user_id] = remaining
+            else:
+                self._in_flight.pop(job.user_id, None)
+            self.not_empty.notify_all()
+
+    def user_stats(self) -> dict:
+        with self.mutex:
+            queued: dict[str, int] = {}
+            for priority_class in self._classes.values():
+                for user, user_queue in priority_class.queues.items():
+                    queued[user] = queued.get(user, 0) + len(user_queue)
+            users = set(self._wait_stats) | set(queued) | set(self._in_flight)
+            return {
+                user: {
+                    "queued": queued.get(user, 0),
+                    "in_flight": self._in_flight.get(user, 0),
+                    "avg_wait_seconds": (
+                        stats["total_wait_seconds"] / stats["jobs"] if stats else 0.0
+                    ),
+                    "max_wait_seconds": stats["max_wait_seconds"] if stats else 0.0,
+                }
+                for user in users
+                for stats in [self._wait_stats.get(user)]
+            }
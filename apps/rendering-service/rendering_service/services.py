@@ -1,42 +1,55 @@
-import json
+import hashlib
 import logging
 import os
-import re
 import subprocess
-import uuid
-import dropbox
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
 import redis
-from dropbox.exceptions import ApiError
-from dropbox.files import WriteMode
+import redis.asyncio as aioredis
+from render_analysis import analysis
+
+from rendering_service import media_cache, metrics, storage
 from rendering_service.core.config import settings
+from rendering_service.publisher import RedisPublisher
+from rendering_service.worker_pool import (
+    RenderCancelledError,
+    RenderTimeoutError,
+    RenderWorkerPool,
+)
+
+video_store = None
+redis_client = None
+publisher = RedisPublisher()
+render_pool = None
 
-dbx = None
+PREVIEW_QUALITY = "preview"
+
+
+class RenderError(Exception):
+    pass
 
 
 async def initialize_services():
-    global dbx, redis_client
+    global video_store, redis_client, render_pool
     from fastapi.concurrency import run_in_threadpool
 
-    if all(
-        [
-            settings.DROPBOX_APP_KEY,
-            settings.DROPBOX_APP_SECRET,
-            settings.DROPBOX_REFRESH_TOKEN,
-        ]
-    ):
-        try:
-            dbx = dropbox.Dropbox(
-                app_key=settings.DROPBOX_APP_KEY,
-                app_secret=settings.DROPBOX_APP_SECRET,
-                oauth2_refresh_token=settings.DROPBOX_REFRESH_TOKEN,
-            )
-            await run_in_threadpool(dbx.users_get_current_account)
-            logging.info("Successfully connected to Dropbox.")
-        except Exception as e:
-            logging.error(f"Failed to connect to Dropbox on startup: {e}")
-            dbx = None
-    else:
-        logging.warning("Dropbox credentials not fully configured.")
+    render_pool = RenderWorkerPool(
+        size=settings.RENDER_CONCURRENCY,
+        max_jobs_per_worker=settings.RENDER_WORKER_MAX_JOBS,
+        cancel_check_interval=settings.CANCEL_CHECK_INTERVAL_SECONDS,
+        cpus_per_worker=settings.RENDER_CPUS_PER_JOB,
+    )
+    await run_in_threadpool(render_pool.start)
+
+    try:
+        video_store = await run_in_threadpool(storage.create_store)
+        logging.info(f"Storing videos in {settings.STORAGE_BACKEND} storage.")
+    except Exception as e:
+        logging.error(f"Failed to set up {settings.STORAGE_BACKEND} storage: {e}")
+        video_store = None
 
     redis_client = None
     try:
@@ -64,94 +77,394 @@ async def initialize_services():
         logging.error(f"Failed to connect to Redis/Valkey on startup: {e}")
         redis_client = None
 
+    if settings.VALKEY_URI:
+        async_client = aioredis.Redis.from_url(
+            settings.VALKEY_URI,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    else:
+        async_client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    await publisher.start(async_client)
 
-def extract_first_scene_name(code: str) -> str:
-    match = re.search(r"class\s+(\w+)\s*\((?:.*\b)?Scene\b(?:.*)?\):", code)
-    if not match:
+
+async def shutdown_services():
+    global render_pool
+    from fastapi.concurrency import run_in_threadpool
+
+    await publisher.stop()
+    if render_pool:
+        await run_in_threadpool(render_pool.shutdown)
+        render_pool = None
+
+
+def analyze_code(code: str) -> dict:
+    try:
+        code_analysis = analysis.analyze(code)
+    except SyntaxError as e:
+        raise ValueError(f"Code contains a syntax error: {e}") from e
+
+    if not code_analysis["scene_names"]:
         raise ValueError(
             "Could not find any class inheriting from 'Scene' in the provided code."
         )
-    scene_name = match.group(1)
-    logging.info(f"Dynamically extracted scene name: {scene_name}")
-    return scene_name
+    logging.info(f"Discovered scene classes: {', '.join(code_analysis['scene_names'])}")
+    return code_analysis
 
 
-def render_video(code: str, scene_name: str) -> str:
-    script_path = f"/tmp/{uuid.uuid4()}.py"
-    with open(script_path, "w", encoding="utf-8") as f:
-        f.write(code)
+def extract_scene_names(code: str) -> list[str]:
+    return analyze_code(code)["scene_names"]
 
-    logging.info(f"Starting Manim render for scene '{scene_name}'")
-    command = [
-        "manim",
-        script_path,
-        scene_name,
-        "--media_dir",
-        settings.VIDEO_OUTPUT_DIR,
-        "-ql",
-    ]
+
+def extract_first_scene_name(code: str) -> str:
+    return extract_scene_names(code)[0]
+
+
+def render_config(quality: str) -> dict:
+    if quality == PREVIEW_QUALITY:
+        height = settings.PREVIEW_PIXEL_HEIGHT
+        return {
+            "quality": "low_quality",
+            "pixel_height": height,
+            "pixel_width": height * 16 // 9,
+            "frame_rate": settings.PREVIEW_FRAME_RATE,
+        }
+    return {"quality": quality}
+
+
+@dataclass
+class RenderOptions:
+    source_id: str | None = None
+    segments: int = 1
+    on_progress: Callable[[dict], None] | None = None
+    should_cancel: Callable[[], bool] | None = None
+    animation_counts: dict[str, int] | None = None
+    on_cpu_seconds: Callable[[float], None] | None = None
+    time_limit: float | None = None
+
+
+def render_limits() -> dict:
+    return {
+        "memory_mb": settings.RENDER_MEMORY_LIMIT_MB,
+        "file_size_mb": settings.RENDER_FILE_SIZE_LIMIT_MB,
+    }
+
+
+def _pool_job(
+    code: str,
+    scene_name: str,
+    media_dir: str,
+    quality: str,
+    source_id: str | None = None,
+    config_overrides: dict | None = None,
+    cache_partition: str | None = None,
+    **options,
+) -> dict:
+    return {
+        "code": code,
+        "scene_name": scene_name,
+        "script_path": os.path.join(media_dir, "scene.py"),
+        "media_dir": media_dir,
+        "render_config": {
+            **render_config(quality),
+            **media_cache.render_overrides(source_id, cache_partition),
+            **(config_overrides or {}),
+        },
+        "limits": render_limits(),
+        **options,
+    }
+
+
+def _run_in_pool(
+    job: dict,
+    options: RenderOptions,
+    timeout: float | None = None,
+    step: str | None = None,
+) -> dict:
+    if not render_pool:
+        raise Exception("Render worker pool is not initialized.")
+
+    scene_name = job["scene_name"]
+    step = step or ("dry_run" if job.get("dry_run") else "manim")
+    timeout = timeout or options.time_limit or settings.RENDER_TIMEOUT_SECONDS
+    started = time.perf_counter()
+    try:
+        result = render_pool.render(
+            job,
+            timeout=timeout,
+            on_progress=options.on_progress,
+            should_cancel=options.should_cancel,
+        )
+    except RenderCancelledError:
+        metrics.observe_step(step, time.perf_counter() - started, "cancelled")
+        raise
+    except Exception as e:
+        metrics.observe_step(step, time.perf_counter() - started, "error")
+        if isinstance(e, RenderTimeoutError):
+            metrics.RENDER_LIMIT_EXCEEDED.labels(limit="wall_time").inc()
+            if options.on_cpu_seconds:
+                options.on_cpu_seconds(timeout)
+        raise
+    if options.on_cpu_seconds:
+        options.on_cpu_seconds(result.get("cpu_seconds", 0.0))
+    encode_seconds = result.get("encode_seconds", 0.0)
+    outcome = "success" if result["ok"] else "error"
+    metrics.observe_step(
+        "pool_wait", time.perf_counter() - started - result["render_seconds"]
+    )
+    metrics.observe_step(step, result["render_seconds"] - encode_seconds, outcome)
+    if encode_seconds:
+        metrics.observe_step("encode", encode_seconds, outcome)
+    if result.get("limit"):
+        metrics.RENDER_LIMIT_EXCEEDED.labels(limit=result["limit"]).inc()
+    if not result["ok"]:
+        logging.error(
+            f"Manim rendering for '{scene_name}' failed:\n{result['traceback']}"
+        )
+        raise RenderError(
+            f"Manim rendering for scene '{scene_name}' failed: {result['error']}"
+        )
+    return result
+
+
+def _render_in_pool(job: dict, options: RenderOptions) -> str:
+    scene_name = job["scene_name"]
+    result = _run_in_pool(job, options)
+    logging.info(
+        f"Rendered scene '{scene_name}' in {result['render_seconds']:.2f}s "
+        f"(time to first frame: {result.get('time_to_first_frame')}s, "
+        f"pool throughput: {render_pool.jobs_per_minute():.0f} jobs/min)."
+    )
+    final_video_path = result["video_path"]
+    if not os.path.exists(final_video_path):
+        raise FileNotFoundError(
+            f"Rendered video for '{scene_name}' not found at expected path."
+        )
+    return final_video_path
+
+
+def code_seed(code: str) -> int:
+    return int(hashlib.sha256(code.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def count_animations(
+    code: str, scene_name: str, media_dir: str, seed: int, options: RenderOptions
+) -> int:
+    job = _pool_job(code, scene_name, media_dir, "low_quality", dry_run=True, seed=seed)
+    return _run_in_pool(job, replace(options, on_progress=None))["animation_count"]
+
+
+def preflight_scene(
+    code: str, scene_name: str, media_dir: str, options: RenderOptions
+) -> int:
+    job = _pool_job(
+        code, scene_name, media_dir, "low_quality", dry_run=True, seed=code_seed(code)
+    )
     try:
-        subprocess.run(command, capture_output=True, text=True, check=True, timeout=600)
-        script_name_stem = os.path.splitext(os.path.basename(script_path))[0]
-        final_video_path = os.path.join(
-            settings.VIDEO_OUTPUT_DIR,
-            "videos",
-            script_name_stem,
-            "480p15",
-            f"{scene_name}.mp4",
+        result = _run_in_pool(
+            job,
+            replace(options, on_progress=None),
+            timeout=settings.PREFLIGHT_TIMEOUT_SECONDS,
+            step="preflight",
+        )
+    except RenderTimeoutError as e:
+        raise RenderTimeoutError(
+            f"Scene '{scene_name}' did not pass its preflight check within "
+            f"{settings.PREFLIGHT_TIMEOUT_SECONDS}s."
+        ) from e
+    return result["animation_count"]
+
+
+def preflight_scenes(
+    code: str, scene_names: list[str], media_dir: str, options: RenderOptions
+) -> dict[str, int]:
+    if len(scene_names) == 1:
+        return {
+            scene_names[0]: preflight_scene(code, scene_names[0], media_dir, options)
+        }
+
+    with ThreadPoolExecutor(max_workers=len(scene_names)) as executor:
+        futures = {
+            scene_name: executor.submit(
+                preflight_scene, code, scene_name, media_dir, options
+            )
+            for scene_name in scene_names
+        }
+        return {scene_name: future.result() for scene_name, future in futures.items()}
+
+
+def plan_segments(animation_count: int, max_segments: int) -> list[tuple[int, int]]:
+    segments = min(max_segments, animation_count // settings.SEGMENT_MIN_ANIMATIONS)
+    if segments <= 1:
+        return []
+    bounds = [round(i * animation_count / segments) for i in range(segments + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(segments)]
+
+
+def render_video_segmented(
+    code: str,
+    scene_name: str,
+    media_dir: str,
+    quality: str,
+    options: RenderOptions,
+) -> str:
+    seed = code_seed(code)
+    animation_count = (options.animation_counts or {}).get(scene_name)
+    if animation_count is None:
+        animation_count = count_animations(code, scene_name, media_dir, seed, options)
+    ranges = plan_segments(animation_count, options.segments)
+    if not ranges:
+        return _render_in_pool(
+            _pool_job(
+                code, scene_name, media_dir, quality, options.source_id, seed=seed
+            ),
+            options,
+        )
+
+    logging.info(
+        f"Rendering scene '{scene_name}' ({animation_count} animations) "
+        f"in {len(ranges)} segments."
+    )
+    jobs = [
+        _pool_job(
+            code,
+            scene_name,
+            media_dir,
+            quality,
+            options.source_id,
+            config_overrides={
+                "from_animation_number": start,
+                "upto_animation_number": end if index < len(ranges) - 1 else -1,
+            },
+            cache_partition=f"part{index}",
+            seed=seed,
+            output_name=f"{scene_name}_part{index}",
+        )
+        for index, (start, end) in enumerate(ranges)
+    ]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        segment_paths = list(
+            executor.map(lambda job: _render_in_pool(job, options), jobs)
         )
+    return concatenate_videos(
+        segment_paths, os.path.join(media_dir, f"{scene_name}_segmented.mp4")
+    )
 
-        if not os.path.exists(final_video_path):
-            raise FileNotFoundError(
-                f"Rendered video for '{scene_name}' not found at expected path."
+
+def render_video(
+    code: str,
+    scene_name: str,
+    media_dir: str,
+    quality: str,
+    options: RenderOptions | None = None,
+) -> str:
+    options = options or RenderOptions()
+    logging.info(f"Starting Manim render for scene '{scene_name}' ({quality})")
+    if options.segments > 1:
+        return render_video_segmented(code, scene_name, media_dir, quality, options)
+    return _render_in_pool(
+        _pool_job(code, scene_name, media_dir, quality, options.source_id), options
+    )
+
+
+def render_scenes(
+    code: str,
+    scene_names: list[str],
+    media_dir: str,
+    quality: str,
+    options: RenderOptions | None = None,
+) -> list[str]:
+    if len(scene_names) == 1:
+        return [render_video(code, scene_names[0], media_dir, quality, options)]
+
+    with ThreadPoolExecutor(max_workers=len(scene_names)) as executor:
+        futures = [
+            executor.submit(render_video, code, scene_name, media_dir, quality, options)
+            for scene_name in scene_names
+        ]
+        return [future.result() for future in futures]
+
+
+def concatenate_videos(video_paths: list[str], output_path: str) -> str:
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in video_paths:
+            f.write(f"file '{path}'\n")
+
+    command = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        list_path,
+        "-c",
+        "copy",
+        "-movflags",
+        "+faststart",
+        output_path,
+    ]
+    try:
+        with metrics.timed_step("concat"):
+            subprocess.run(
+                command, capture_output=True, text=True, check=True, timeout=300
             )
-        return final_video_path
     except subprocess.CalledProcessError as e:
-        logging.error(f"Manim rendering for '{scene_name}' failed. STDERR:\n{e.stderr}")
-        raise Exception(f"Manim rendering for scene '{scene_name}' failed.") from e
+        logging.error(f"Concatenating {len(video_paths)} videos failed:\n{e.stderr}")
+        raise RenderError("Failed to concatenate rendered scenes.") from e
+    except subprocess.TimeoutExpired as e:
+        logging.error(
+            f"Concatenating {len(video_paths)} videos timed out after {e.timeout}s."
+        )
+        raise RenderError("Failed to concatenate rendered scenes.") from e
     finally:
-        if os.path.exists(script_path):
-            os.remove(script_path)
+        os.remove(list_path)
+    return output_path
 
 
 def upload_and_get_link(
     file_path: str, source_id: str, task_id: str, scene_name: str
 ) -> str:
-    if not dbx:
-        raise Exception("Dropbox client is not initialized.")
+    if not video_store:
+        raise Exception("Video storage is not initialized.")
 
-    file_name = f"{task_id}_{source_id}_{scene_name}.mp4"
-    dropbox_path = f"/{file_name}"
-    logging.info(f"Uploading {file_name} to Dropbox path: {dropbox_path}")
+    extension = os.path.splitext(file_path)[1] or ".mp4"
+    file_name = f"{task_id}_{source_id}_{scene_name}{extension}"
+    logging.info(f"Uploading {file_name} to {settings.STORAGE_BACKEND} storage.")
 
-    try:
-        with open(file_path, "rb") as f:
-            dbx.files_upload(f.read(), dropbox_path, mode=WriteMode("overwrite"))
+    upload_started = time.perf_counter()
+    with metrics.timed_step("upload"):
+        file_size = video_store.upload(file_path, file_name)
+    upload_seconds = time.perf_counter() - upload_started
 
-        link_settings = dropbox.sharing.SharedLinkSettings(
-            requested_visibility=dropbox.sharing.RequestedVisibility.public
-        )
-        link_metadata = dbx.sharing_create_shared_link_with_settings(
-            dropbox_path, settings=link_settings
-        )
-        return link_metadata.url.replace(
-            "www.dropbox.com", "dl.dropboxusercontent.com"
-        ).replace("?dl=0", "")
-    except ApiError as e:
-        logging.error(f"Dropbox API Error for {file_name}: {e}")
-        raise Exception(
-            f"Failed to upload or create link on Dropbox for {file_name}."
-        ) from e
+    link_started = time.perf_counter()
+    with metrics.timed_step("share_link"):
+        video_url = video_store.link(file_name)
+    link_seconds = time.perf_counter() - link_started
+    logging.info(
+        f"Uploaded {file_name} ({file_size / 1024 / 1024:.1f}MB) in "
+        f"{upload_seconds:.2f}s, link created in {link_seconds:.2f}s."
+    )
+    return video_url
+
+
+def publish_progress_message(message: dict):
+    publisher.publish(settings.REDIS_PROGRESS_CHANNEL, message, durable=False)
 
 
 def publish_redis_message(message: dict):
-    if not redis_client:
-        logging.error("Cannot publish message: Redis/Valkey client is not initialized.")
-        return
-    try:
-        logging.info(
-            f"Publishing message to Redis channel '{settings.REDIS_CHANNEL}': {message}"
-        )
-        redis_client.publish(settings.REDIS_CHANNEL, json.dumps(message))
-    except Exception as e:
-        logging.error(f"Failed to publish to Redis: {e}")
+    logging.info(
+        f"Publishing message to Redis channel '{settings.REDIS_CHANNEL}': {message}"
+    )
+    if not publisher.publish(settings.REDIS_CHANNEL, message):
+        logging.error("Cannot publish message: Redis publisher is not running.")
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from rendering_service import render_cache, services
+from rendering_service.core.config import settings
+
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def lease_key(cache_key: str) -> str:
+    return f"{cache_key}:lease"
+
+
+class Lease:
+    def __init__(self, cache_key: str, token: str):
+        self.cache_key = cache_key
+        self.token = token
+        self._released = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._renew_until_released, name="singleflight-lease", daemon=True
+        )
+        self._heartbeat.start()
+
+    def _renew_until_released(self):
+        interval = max(settings.SINGLEFLIGHT_LEASE_SECONDS / 3, 0.1)
+        while not self._released.wait(interval):
+            try:
+                renewed = services.redis_client.eval(
+                    _RENEW_SCRIPT,
+                    1,
+                    lease_key(self.cache_key),
+                    self.token,
+                    settings.SINGLEFLIGHT_LEASE_SECONDS,
+                )
+            except Exception as e:
+                logging.warning(f"Renewing lease '{self.cache_key}' failed: {e}")
+                continue
+            if not renewed:
+                logging.warning(
+                    f"Lost the render lease for '{self.cache_key}', "
+                    "another instance may render it too."
+                )
+                return
+
+    def release(self):
+        if self._released.is_set():
+            return
+        self._released.set()
+        try:
+            services.redis_client.eval(
+                _RELEASE_SCRIPT, 1, lease_key(self.cache_key), self.token
+            )
+        except Exception as e:
+            logging.warning(f"Releasing lease '{self.cache_key}' failed: {e}")
+
+
+def _try_acquire(cache_key: str) -> Lease | None:
+    token = uuid.uuid4().hex
+    try:
+        acquired = services.redis_client.set(
+            lease_key(cache_key),
+            token,
+            nx=True,
+            ex=settings.SINGLEFLIGHT_LEASE_SECONDS,
+        )
+    except Exception as e:
+        logging.warning(f"Claiming lease '{cache_key}' failed, rendering anyway: {e}")
+        return Lease(cache_key, token)
+    return Lease(cache_key, token) if acquired else None
+
+
+def enabled() -> bool:
+    return (
+        settings.SINGLEFLIGHT_ENABLED
+        and settings.RENDER_CACHE_ENABLED
+        and services.redis_client is not None
+    )
+
+
+def try_lead(cache_key: str) -> tuple[Lease | None, dict | None]:
+    lease = _try_acquire(cache_key)
+    if lease:
+        cached = render_cache.lookup(cache_key)
+        if cached:
+            lease.release()
+            return None, cached
+    return lease, None
+
+
+class WaitingRoom:
+    def __init__(self, resume: Callable[[Any, Lease | None, dict | None], None]):
+        self._resume = resume
+        self._lock = threading.Lock()
+        self._waiting: dict[str, list[tuple[Any, float]]] = {}
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="singleflight-waiting-room", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def park(self, cache_key: str, item: Any):
+        deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS
+        with self._lock:
+            self._waiting.setdefault(cache_key, []).append((item, deadline))
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiting.values())
+
+    def _run(self):
+        while not self._stopped.wait(settings.SINGLEFLIGHT_POLL_SECONDS):
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Single-flight waiting room poll failed: {e}")
+
+    def poll(self):
+        with self._lock:
+            cache_keys = list(self._waiting)
+        for cache_key in cache_keys:
+            cached = render_cache.lookup(cache_key)
+            lease = None
+            if not cached:
+                lease, cached = try_lead(cache_key)
+            now = time.monotonic()
+            ready = []
+            with self._lock:
+                remaining = []
+                for item, deadline in self._waiting.pop(cache_key, []):
+                    if cached:
+                        ready.append((item, None, cached))
+                    elif lease:
+                        ready.append((item, lease, None))
+                        lease = None
+                    elif now >= deadline:
+                        logging.warning(
+                            f"Gave up waiting for '{cache_key}', rendering it anyway."
+                        )
+                        ready.append((item, None, None))
+                    else:
+                        remaining.append((item, deadline))
+                if remaining:
+                    self._waiting[cache_key] = remaining
+            if lease:
+                lease.release()
+            for item, item_lease, item_cached in ready:
+                self._resume(item, item_lease, item_cached)
@@ -0,0 +1,356 @@
+import datetime
+import hashlib
+import hmac
+import http.client
+import logging
+import mimetypes
+import os
+import shutil
+import time
+import urllib.parse
+import xml.etree.ElementTree as ElementTree
+
+import dropbox
+from dropbox.exceptions import ApiError
+from dropbox.files import CommitInfo, UploadSessionCursor, WriteMode
+
+from rendering_service.core.config import settings
+
+S3_NAMESPACE = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+DROPBOX_BATCH_DELETE_SIZE = 1000
+PARTIAL_SUFFIX = ".part"
+
+
+class StorageError(Exception):
+    pass
+
+
+class TransientStorageError(StorageError):
+    pass
+
+
+class VideoStore:
+    def upload(self, file_path: str, key: str) -> int:
+        raise NotImplementedError
+
+    def link(self, key: str) -> str:
+        raise NotImplementedError
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        raise NotImplementedError
+
+
+def upload_file_in_chunks(client, file_path: str, dropbox_path: str) -> int:
+    file_size = os.path.getsize(file_path)
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_MB * 1024 * 1024
+    mode = WriteMode("overwrite")
+
+    with open(file_path, "rb") as f:
+        if file_size <= chunk_size:
+            client.files_upload(f.read(), dropbox_path, mode=mode)
+            return file_size
+
+        session = client.files_upload_session_start(f.read(chunk_size))
+        cursor = UploadSessionCursor(session_id=session.session_id, offset=f.tell())
+        commit = CommitInfo(path=dropbox_path, mode=mode)
+        while file_size - f.tell() > chunk_size:
+            client.files_upload_session_append_v2(f.read(chunk_size), cursor)
+            cursor.offset = f.tell()
+        client.files_upload_session_finish(f.read(chunk_size), cursor, commit)
+    return file_size
+
+
+class DropboxStore(VideoStore):
+    def __init__(self, client):
+        self.client = client
+
+    def upload(self, file_path: str, key: str) -> int:
+        try:
+            return upload_file_in_chunks(self.client, file_path, f"/{key}")
+        except ApiError as e:
+            raise StorageError(f"Failed to upload {key} to Dropbox.") from e
+
+    def link(self, key: str) -> str:
+        link_settings = dropbox.sharing.SharedLinkSettings(
+            requested_visibility=dropbox.sharing.RequestedVisibility.public
+        )
+        try:
+            link_metadata = self.client.sharing_create_shared_link_with_settings(
+                f"/{key}", settings=link_settings
+            )
+        except ApiError as e:
+            raise StorageError(f"Failed to create a Dropbox link for {key}.") from e
+        return link_metadata.url.replace(
+            "www.dropbox.com", "dl.dropboxusercontent.com"
+        ).replace("?dl=0", "")
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        threshold = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+            seconds=max_age_seconds
+        )
+        old_paths = []
+        result = self.client.files_list_folder("", recursive=True)
+        while True:
+            for entry in result.entries:
+                if not isinstance(entry, dropbox.files.FileMetadata):
+                    continue
+                modified = entry.client_modified.replace(tzinfo=datetime.UTC)
+                if modified < threshold:
+                    old_paths.append(entry.path_display)
+            if not result.has_more:
+                break
+            result = self.client.files_list_folder_continue(result.cursor)
+
+        for i in range(0, len(old_paths), DROPBOX_BATCH_DELETE_SIZE):
+            batch = old_paths[i : i + DROPBOX_BATCH_DELETE_SIZE]
+            self.client.files_delete_batch(
+                [dropbox.files.DeleteArg(path) for path in batch]
+            )
+        return len(old_paths)
+
+
+class LocalStore(VideoStore):
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.realpath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError(f"Storage key '{key}' is outside the store.")
+        return path
+
+    def upload(self, file_path: str, key: str) -> int:
+        destination = self.path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        partial_path = f"{destination}{PARTIAL_SUFFIX}"
+        shutil.copyfile(file_path, partial_path)
+        os.replace(partial_path, destination)
+        return os.path.getsize(destination)
+
+    def link(self, key: str) -> str:
+        return f"{self.base_url}/{urllib.parse.quote(key)}"
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        deleted += 1
+                except FileNotFoundError:
+                    continue
+        return deleted
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return urllib.parse.quote(value, safe=safe)
+
+
+class S3Store(VideoStore):
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = "us-east-1",
+        public_url: str | None = None,
+    ):
+        self.endpoint = urllib.parse.urlsplit(endpoint_url)
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.public_url = (public_url or endpoint_url).rstrip("/")
+
+    def _authorization(
+        self, method: str, path: str, query: str, headers: dict, amz_date: str
+    ) -> str:
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                query,
+                "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+                signed_headers,
+                headers["x-amz-content-sha256"],
+            ]
+        )
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signing_key = f"AWS4{self.secret_access_key}".encode()
+        for part in (amz_date[:8], self.region, "s3", "aws4_request"):
+            signing_key = _hmac_sha256(signing_key, part)
+        signature = hmac.new(
+            signing_key, string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        return (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+
+    def _request(
+        self,
+        method: str,
+        key: str = "",
+        params: dict | None = None,
+        body=None,
+        extra_headers: dict | None = None,
+    ) -> bytes:
+        path = f"{self.endpoint.path.rstrip('/')}/{self.bucket}"
+        if key:
+            path = f"{path}/{_uri_encode(key, safe='/-_.~')}"
+        query = "&".join(
+            f"{_uri_encode(name)}={_uri_encode(value)}"
+            for name, value in sorted((params or {}).items())
+        )
+        amz_date = datetime.datetime.now(datetime.UTC).strftime("%Y%m%dT%H%M%SZ")
+        headers = {
+            "host": self.endpoint.netloc,
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+            "x-amz-date": amz_date,
+        }
+        headers["Authorization"] = self._authorization(
+            method, path, query, headers, amz_date
+        )
+        headers.update(extra_headers or {})
+
+        connection_class = (
+            http.client.HTTPSConnection
+            if self.endpoint.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        connection = connection_class(
+            self.endpoint.netloc, timeout=settings.STORAGE_TIMEOUT_SECONDS
+        )
+        try:
+            connection.request(
+                method, f"{path}?{query}" if query else path, body, headers
+            )
+            response = connection.getresponse()
+            data = response.read()
+        except OSError as e:
+            raise TransientStorageError(f"S3 {method} {path} failed: {e}") from e
+        finally:
+            connection.close()
+
+        if response.status >= 500:
+            raise TransientStorageError(
+                f"S3 {method} {path} failed with status {response.status}."
+            )
+        if response.status >= 300:
+            raise StorageError(
+                f"S3 {method} {path} failed with status {response.status}: "
+                f"{data[:200]!r}"
+            )
+        return data
+
+    def upload(self, file_path: str, key: str) -> int:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            self._request(
+                "PUT",
+                key,
+                body=f,
+                extra_headers={
+                    "Content-Length": str(file_size),
+                    "Content-Type": mimetypes.guess_type(key)[0]
+                    or "application/octet-stream",
+                },
+            )
+        return file_size
+
+    def link(self, key: str) -> str:
+        return f"{self.public_url}/{self.bucket}/{_uri_encode(key, safe='/-_.~')}"
+
+    def delete_older_than(self, max_age_seconds: float) -> int:
+        threshold = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+            seconds=max_age_seconds
+        )
+        deleted = 0
+        params = {"list-type": "2"}
+        while True:
+            listing = ElementTree.fromstring(self._request("GET", params=params))
+            for item in listing.findall("s3:Contents", S3_NAMESPACE):
+                key = item.findtext("s3:Key", namespaces=S3_NAMESPACE)
+                modified = datetime.datetime.fromisoformat(
+                    item.findtext("s3:LastModified", namespaces=S3_NAMESPACE)
+                )
+                if modified < threshold:
+                    self._request("DELETE", key)
+                    deleted += 1
+            token = listing.findtext(
+                "s3:NextContinuationToken", namespaces=S3_NAMESPACE
+            )
+            if listing.findtext("s3:IsTruncated", namespaces=S3_NAMESPACE) != "true":
+                return deleted
+            params = {"list-type": "2", "continuation-token": token}
+
+
+def create_store() -> VideoStore:
+    backend = settings.STORAGE_BACKEND
+    if backend == "local":
+        return LocalStore(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_BASE_URL)
+    if backend == "s3":
+        if not all(
+            [
+                settings.S3_ENDPOINT_URL,
+                settings.S3_ACCESS_KEY_ID,
+                settings.S3_SECRET_ACCESS_KEY,
+            ]
+        ):
+            raise StorageError("S3 storage is not fully configured.")
+        return S3Store(
+            settings.S3_ENDPOINT_URL,
+            settings.S3_BUCKET,
+            settings.S3_ACCESS_KEY_ID,
+            settings.S3_SECRET_ACCESS_KEY,
+            settings.S3_REGION,
+            settings.S3_PUBLIC_URL,
+        )
+    if backend == "dropbox":
+        if not all(
+            [
+                settings.DROPBOX_APP_KEY,
+                settings.DROPBOX_APP_SECRET,
+                settings.DROPBOX_REFRESH_TOKEN,
+            ]
+        ):
+            raise StorageError("Dropbox credentials not fully configured.")
+        client = dropbox.Dropbox(
+            app_key=settings.DROPBOX_APP_KEY,
+            app_secret=settings.DROPBOX_APP_SECRET,
+            oauth2_refresh_token=settings.DROPBOX_REFRESH_TOKEN,
+        )
+        client.users_get_current_account()
+        return DropboxStore(client)
+    raise StorageError(f"Unknown storage backend '{backend}'.")
+
+
+def main():
+    store = create_store()
+    deleted = store.delete_older_than(settings.STORAGE_RETENTION_SECONDS)
+    logging.info(
+        f"Deleted {deleted} videos older than {settings.STORAGE_RETENTION_SECONDS}s "
+        f"from {settings.STORAGE_BACKEND} storage."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import email.utils
+import functools
+import logging
+import mimetypes
+import os
+import re
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rendering_service.core.config import settings
+from rendering_service.storage import PARTIAL_SUFFIX
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        raise ValueError(f"Unsupported range '{header}'.")
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+class VideoRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, directory: str, **kwargs):
+        self.directory = os.path.realpath(directory)
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+    def _resolve(self) -> str | None:
+        name = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        path = os.path.realpath(os.path.join(self.directory, name.lstrip("/")))
+        if not path.startswith(self.directory + os.sep) or not os.path.isfile(path):
+            return None
+        if path.endswith(PARTIAL_SUFFIX):
+            return None
+        return path
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        path = self._resolve()
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag, stat.st_mtime)
+            self.end_headers()
+            return
+
+        byte_range = (0, size - 1)
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (if_range is None or if_range == etag):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                byte_range = (0, size - 1)
+            else:
+                if byte_range is None:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        start, end = byte_range
+        length = max(end - start + 1, 0)
+        self.send_response(status)
+        self.send_header(
+            "Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream"
+        )
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self._send_cache_headers(etag, stat.st_mtime)
+        self.end_headers()
+        if not send_body or length == 0:
+            return
+        with open(path, "rb") as f:
+            self.wfile.flush()
+            self.connection.sendfile(f, offset=start, count=length)
+
+    def _send_cache_headers(self, etag: str, modified: float):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(modified, usegmt=True))
+        self.send_header(
+            "Cache-Control",
+            f"public, max-age={settings.LOCAL_STORAGE_CACHE_MAX_AGE_SECONDS}, "
+            "immutable",
+        )
+
+
+def create_server(directory: str, host: str, port: int) -> ThreadingHTTPServer:
+    os.makedirs(directory, exist_ok=True)
+    handler = functools.partial(VideoRequestHandler, directory=directory)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    server = create_server(
+        settings.LOCAL_STORAGE_DIR,
+        settings.LOCAL_STORAGE_HOST,
+        settings.LOCAL_STORAGE_PORT,
+    )
+    logging.info(
+        f"Serving {settings.LOCAL_STORAGE_DIR} on "
+        f"{settings.LOCAL_STORAGE_HOST}:{settings.LOCAL_STORAGE_PORT}."
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
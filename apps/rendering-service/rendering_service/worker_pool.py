@@ -0,0 +1,464 @@
+import contextlib
+import errno
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import signal
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class WorkerCrashedError(Exception):
+    pass
+
+
+class RenderTimeoutError(Exception):
+    pass
+
+
+class RenderCancelledError(Exception):
+    pass
+
+
+LIMIT_MESSAGES = {
+    "memory": "Render exceeded the {memory_mb} MB memory limit.",
+    "file_size": "Render output exceeded the {file_size_mb} MB file size limit.",
+}
+
+
+def _set_limit(kind: int, size: int):
+    _, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        size = min(size, hard)
+    resource.setrlimit(kind, (size, size))
+
+
+def _apply_limits(limits: dict):
+    if limits.get("memory_mb"):
+        _set_limit(resource.RLIMIT_AS, limits["memory_mb"] * 1024 * 1024)
+    if limits.get("file_size_mb"):
+        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+        _set_limit(resource.RLIMIT_FSIZE, limits["file_size_mb"] * 1024 * 1024)
+
+
+def _exceeded_limit(error: BaseException, limits: dict) -> str | None:
+    if isinstance(error, MemoryError) and limits.get("memory_mb"):
+        return "memory"
+    if (
+        isinstance(error, OSError)
+        and error.errno == errno.EFBIG
+        and limits.get("file_size_mb")
+    ):
+        return "file_size"
+    return None
+
+
+def _exit_failure(exit_code: int) -> tuple[str, str | None]:
+    if exit_code == -signal.SIGKILL:
+        return (
+            "Render process was killed by the system, most likely for running "
+            "out of memory.",
+            "oom_kill",
+        )
+    return f"Render process exited unexpectedly (exit code {exit_code}).", None
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _usage_cpu_seconds(usage: resource.struct_rusage) -> float:
+    return usage.ru_utime + usage.ru_stime
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return _usage_cpu_seconds(own) + _usage_cpu_seconds(children)
+
+
+def _seed_random(seed: int):
+    import numpy
+
+    random.seed(seed)
+    numpy.random.seed(seed)
+
+
+def _describe_animations(animations: tuple) -> str:
+    names = []
+    for animation in animations:
+        name = type(animation).__name__
+        names.append("animate" if name == "_AnimationBuilder" else name)
+    return ", ".join(names) or "Animation"
+
+
+def _run_job(job: dict, report=None) -> dict:
+    from manim import tempconfig
+
+    started = time.perf_counter()
+    first_frame_at = None
+    dry_run = job.get("dry_run", False)
+
+    try:
+        with tempconfig(
+            {
+                **job["render_config"],
+                "input_file": job["script_path"],
+                "media_dir": job["media_dir"],
+                "output_file": job.get("output_name", job["scene_name"]),
+                "write_to_movie": not dry_run,
+                "verbosity": "WARNING",
+                "progress_bar": "none",
+            }
+        ):
+            if job.get("seed") is not None:
+                _seed_random(job["seed"])
+            namespace = {"__name__": "__luminth_scene__"}
+            exec(compile(job["code"], job["script_path"], "exec"), namespace)
+            scene_cls = namespace.get(job["scene_name"])
+            if scene_cls is None:
+                raise ValueError(f"Scene '{job['scene_name']}' is not defined.")
+
+            if dry_run:
+                scene = scene_cls(skip_animations=True)
+                scene.render()
+                return {
+                    "ok": True,
+                    "animation_count": scene.renderer.num_plays,
+                    "render_seconds": time.perf_counter() - started,
+                    "max_rss_mb": _max_rss_mb(),
+                    "cpu_seconds": _cpu_seconds(),
+                }
+
+            scene = scene_cls()
+            file_writer = scene.renderer.file_writer
+            write_frame = file_writer.write_frame
+
+            def timed_write_frame(*args, **kwargs):
+                nonlocal first_frame_at
+                if first_frame_at is None:
+                    first_frame_at = time.perf_counter()
+                return write_frame(*args, **kwargs)
+
+            file_writer.write_frame = timed_write_frame
+
+            encode_seconds = 0.0
+            finish = file_writer.finish
+
+            def timed_finish(*args, **kwargs):
+                nonlocal encode_seconds
+                finish_started = time.perf_counter()
+                try:
+                    return finish(*args, **kwargs)
+                finally:
+                    encode_seconds += time.perf_counter() - finish_started
+
+            file_writer.finish = timed_finish
+
+            if report:
+                renderer = scene.renderer
+                play = renderer.play
+
+                def reporting_play(scene_arg, *args, **kwargs):
+                    play_started = time.perf_counter()
+                    result = play(scene_arg, *args, **kwargs)
+                    report(
+                        {
+                            "scene_name": job["scene_name"],
+                            "animation": _describe_animations(args),
+                            "skipped": renderer.skip_animations,
+                            "seconds": time.perf_counter() - play_started,
+                        }
+                    )
+                    return result
+
+                renderer.play = reporting_play
+
+            scene.render()
+            video_path = str(file_writer.movie_file_path)
+
+        return {
+            "ok": True,
+            "video_path": video_path,
+            "render_seconds": time.perf_counter() - started,
+            "time_to_first_frame": (
+                first_frame_at - started if first_frame_at is not None else None
+            ),
+            "encode_seconds": encode_seconds,
+            "max_rss_mb": _max_rss_mb(),
+            "cpu_seconds": _cpu_seconds(),
+        }
+    except Exception as e:
+        limits = job.get("limits", {})
+        limit = _exceeded_limit(e, limits)
+        return {
+            "ok": False,
+            "error": (
+                LIMIT_MESSAGES[limit].format(**limits)
+                if limit
+                else f"{type(e).__name__}: {e}"
+            ),
+            "limit": limit,
+            "traceback": traceback.format_exc(),
+            "render_seconds": time.perf_counter() - started,
+            "max_rss_mb": _max_rss_mb(),
+            "cpu_seconds": _cpu_seconds(),
+        }
+
+
+def _run_isolated(conn, job: dict):
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            conn.send({"started": os.getpid()})
+            _apply_limits(job.get("limits", {}))
+            conn.send(_run_job(job, lambda event: conn.send({"progress": event})))
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status, usage = os.wait4(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    if exit_code != 0:
+        error, limit = _exit_failure(exit_code)
+        conn.send(
+            {
+                "ok": False,
+                "error": error,
+                "limit": limit,
+                "traceback": "",
+                "render_seconds": time.perf_counter() - started,
+                "cpu_seconds": _usage_cpu_seconds(usage),
+            }
+        )
+
+
+def _worker_main(conn, cpus=None):
+    os.setsid()
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    started = time.perf_counter()
+    import manim  # noqa: F401
+
+    conn.send({"ready": True, "startup_seconds": time.perf_counter() - started})
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        _run_isolated(conn, job)
+
+
+class RenderWorker:
+    def __init__(self, ctx, cpus: list[int] | None = None):
+        self.cpus = cpus
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, cpus), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.jobs_completed = 0
+        self.job_pid: int | None = None
+
+    def wait_ready(self, timeout: float):
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise WorkerCrashedError("Render worker did not start in time.")
+        message = self.conn.recv()
+        self.ready = True
+        logging.info(
+            f"Render worker {self.process.pid} ready in "
+            f"{message['startup_seconds']:.2f}s."
+        )
+
+    def kill(self):
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self.process.pid, signal.SIGKILL)
+        self.process.kill()
+
+    def cancel_job(self, timeout: float = 5) -> bool:
+        if self.job_pid is None:
+            return False
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(self.job_pid, signal.SIGKILL)
+        self.job_pid = None
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not self.conn.poll(remaining):
+                return False
+            message = self.conn.recv()
+            if "progress" not in message and "started" not in message:
+                return True
+        return False
+
+    def stop(self):
+        with contextlib.suppress(BrokenPipeError, OSError):
+            self.conn.send(None)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class RenderWorkerPool:
+    def __init__(
+        self,
+        size: int,
+        max_jobs_per_worker: int,
+        startup_timeout: float = 120,
+        start_method: str = "spawn",
+        cancel_check_interval: float = 1.0,
+        cpus_per_worker: int | None = None,
+    ):
+        self.size = size
+        self.cpus_per_worker = cpus_per_worker
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.startup_timeout = startup_timeout
+        self.cancel_check_interval = cancel_check_interval
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle: queue.Queue[RenderWorker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._completed_at: deque[float] = deque(maxlen=1000)
+        self._busy = 0
+
+    def start(self):
+        for slot in range(self.size):
+            self._idle.put(RenderWorker(self._ctx, self._slot_cpus(slot)))
+        logging.info(f"Started render worker pool with {self.size} worker(s).")
+
+    def shutdown(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+        logging.info("Render worker pool shut down.")
+
+    def _slot_cpus(self, slot: int) -> list[int] | None:
+        if not self.cpus_per_worker:
+            return None
+        available = sorted(os.sched_getaffinity(0))
+        count = min(self.cpus_per_worker, len(available))
+        start = slot * count
+        return [available[(start + i) % len(available)] for i in range(count)]
+
+    def _replace(self, worker: RenderWorker, reason: str) -> RenderWorker:
+        logging.info(f"Recycling render worker {worker.process.pid}: {reason}")
+        worker.stop()
+        return RenderWorker(self._ctx, worker.cpus)
+
+    def _recycle_reason(self, worker: RenderWorker) -> str | None:
+        if worker.jobs_completed >= self.max_jobs_per_worker:
+            return f"completed {worker.jobs_completed} jobs"
+        return None
+
+    def _acquire(self, should_cancel) -> RenderWorker:
+        while True:
+            try:
+                return self._idle.get(
+                    timeout=self.cancel_check_interval if should_cancel else None
+                )
+            except queue.Empty:
+                if should_cancel():
+                    raise RenderCancelledError(
+                        "Render was cancelled before it started."
+                    ) from None
+
+    def _receive_result(
+        self, worker: RenderWorker, timeout: float, on_progress, should_cancel=None
+    ) -> dict | None:
+        now = time.monotonic()
+        deadline = now + timeout
+        next_check = now + self.cancel_check_interval
+        while True:
+            now = time.monotonic()
+            if should_cancel and now >= next_check:
+                if should_cancel():
+                    raise RenderCancelledError("Render was cancelled.")
+                next_check = now + self.cancel_check_interval
+            remaining = deadline - now
+            if remaining <= 0:
+                return None
+            if should_cancel:
+                remaining = min(remaining, next_check - now)
+            if not worker.conn.poll(remaining):
+                continue
+            message = worker.conn.recv()
+            if "started" in message:
+                worker.job_pid = message["started"]
+                continue
+            if "progress" not in message:
+                worker.job_pid = None
+                return message
+            if on_progress:
+                try:
+                    on_progress(message["progress"])
+                except Exception as e:
+                    logging.warning(f"Render progress callback failed: {e}")
+
+    def render(
+        self, job: dict, timeout: float, on_progress=None, should_cancel=None
+    ) -> dict:
+        worker = self._acquire(should_cancel)
+        with self._lock:
+            self._busy += 1
+        try:
+            worker.wait_ready(self.startup_timeout)
+            worker.conn.send(job)
+            try:
+                result = self._receive_result(
+                    worker, timeout, on_progress, should_cancel
+                )
+            except RenderCancelledError:
+                if not worker.cancel_job():
+                    worker.kill()
+                    worker = self._replace(worker, "cancelled render did not stop")
+                raise
+            if result is None:
+                worker.kill()
+                worker = self._replace(worker, "render timed out")
+                raise RenderTimeoutError(
+                    f"Render exceeded the {timeout:.0f}s time limit."
+                )
+
+            worker.jobs_completed += 1
+            reason = self._recycle_reason(worker)
+            if reason:
+                worker = self._replace(worker, reason)
+            self._completed_at.append(time.monotonic())
+            return result
+        except (EOFError, OSError, WorkerCrashedError) as e:
+            exit_code = worker.process.exitcode
+            worker = self._replace(worker, f"worker failed ({e})")
+            raise WorkerCrashedError(
+                f"Render worker exited unexpectedly (exit code {exit_code})."
+            ) from e
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._idle.put(worker)
+
+    def jobs_per_minute(self) -> float:
+        cutoff = time.monotonic() - 60
+        return float(sum(1 for t in self._completed_at if t >= cutoff))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "busy": self._busy,
+            "jobs_per_minute": self.jobs_per_minute(),
+        }
@@ -0,0 +1,92 @@
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+from rendering_service.core.config import settings
+
+_released: queue.Queue[str] = queue.Queue()
+_stop_event = threading.Event()
+_janitor: threading.Thread | None = None
+
+
+def scratch_root() -> str:
+    return settings.RENDER_SCRATCH_DIR or settings.VIDEO_OUTPUT_DIR
+
+
+def create_job_workspace(job_id: str) -> str:
+    path = os.path.join(scratch_root(), f"job-{job_id}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(path)
+    return path
+
+
+def release_workspace(path: str):
+    if _janitor and _janitor.is_alive():
+        _released.put(path)
+    else:
+        _remove(path)
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=True)
+        logging.info(f"Cleaned up job workspace: {path}")
+
+
+def _sweep_stale():
+    root = scratch_root()
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - settings.WORKSPACE_MAX_AGE_SECONDS
+    for entry in os.scandir(root):
+        if entry.name.startswith("job-") and entry.is_dir():
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    logging.warning(f"Removing stale job workspace: {entry.path}")
+                    _remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+
+def _janitor_loop():
+    next_sweep = time.monotonic()
+    while not _stop_event.is_set():
+        try:
+            path = _released.get(timeout=1)
+            _remove(path)
+        except queue.Empty:
+            pass
+        if time.monotonic() >= next_sweep:
+            _sweep_stale()
+            next_sweep = time.monotonic() + settings.WORKSPACE_SWEEP_INTERVAL_SECONDS
+
+    while True:
+        try:
+            _remove(_released.get_nowait())
+        except queue.Empty:
+            break
+
+
+def start_janitor():
+    global _janitor
+    if _janitor and _janitor.is_alive():
+        return
+    os.makedirs(scratch_root(), exist_ok=True)
+    _stop_event.clear()
+    _janitor = threading.Thread(
+        target=_janitor_loop, name="workspace-janitor", daemon=True
+    )
+    _janitor.start()
+    logging.info(f"Workspace janitor started for {scratch_root()}.")
+
+
+def stop_janitor():
+    global _janitor
+    if not _janitor:
+        return
+    _stop_event.set()
+    _janitor.join(timeout=10)
+    _janitor = None
@@ -0,0 +1,42 @@
+from rendering_service import cancellation, services
+from rendering_service.pipeline import RenderJob
+
+
+class FakeRedis:
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key):
+        return self.store.get(key)
+
+
+def _job(request_timestamp):
+    return RenderJob(
+        job_id="job-1",
+        user_id="user-1",
+        code="",
+        source_id="canvas-1",
+        source_type="canvas",
+        request_timestamp=request_timestamp,
+    )
+
+
+def test_only_older_requests_are_superseded(monkeypatch):
+    """
+    Tests that a job is superseded only by a strictly newer request.
+    """
+    key = cancellation.latest_request_key("canvas", "canvas-1")
+    latest = "2025-01-01T12:00:00+00:00"
+    monkeypatch.setattr(services, "redis_client", FakeRedis({key: "1735732800.0"}))
+
+    assert cancellation.is_superseded(_job("2025-01-01T11:59:59+00:00")) is True
+    assert cancellation.is_superseded(_job(latest)) is False
+
+
+def test_jobs_without_a_recorded_request_keep_running(monkeypatch):
+    """
+    Tests that jobs are not cancelled when no newer request was recorded.
+    """
+    monkeypatch.setattr(services, "redis_client", FakeRedis({}))
+
+    assert cancellation.is_superseded(_job("2025-01-01T11:59:59+00:00")) is False
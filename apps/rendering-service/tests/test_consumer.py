@@ -0,0 +1,50 @@
+from concurrent.futures import Future
+
+from rendering_service.consumer import PullConsumer
+
+
+class FakeMessage:
+    def __init__(self, data=b"code", attributes=None):
+        self.message_id = "message-1"
+        self.data = data
+        self.attributes = attributes or {"job_id": "job-1"}
+        self.settled = []
+
+    def ack(self):
+        self.settled.append("ack")
+
+    def nack(self):
+        self.settled.append("nack")
+
+
+def test_pull_consumer_settles_when_the_job_finishes():
+    """
+    Tests that pulled messages are acked or nacked only once their job resolves.
+    """
+    futures = []
+
+    def handler(data, attributes):
+        futures.append(Future())
+        return futures[-1]
+
+    consumer = PullConsumer(handler)
+    succeeded, retried = FakeMessage(), FakeMessage()
+    consumer.on_message(succeeded)
+    consumer.on_message(retried)
+
+    assert succeeded.settled == [] and retried.settled == []
+    futures[0].set_result(True)
+    futures[1].set_result(False)
+    assert succeeded.settled == ["ack"]
+    assert retried.settled == ["nack"]
+
+
+def test_pull_consumer_acks_invalid_messages_immediately():
+    """
+    Tests that messages rejected by the handler are acked without rendering.
+    """
+    message = FakeMessage()
+
+    PullConsumer(lambda data, attributes: None).on_message(message)
+
+    assert message.settled == ["ack"]
@@ -0,0 +1,77 @@
+import subprocess
+
+import pytest
+
+from rendering_service import encoding
+from rendering_service.core.config import settings
+from rendering_service.services import RenderError
+
+
+def test_default_profile_only_remuxes_for_faststart():
+    """
+    Tests that the default profile copies streams and moves the moov atom.
+    """
+    command = encoding.encode_command("in.mp4", "out.mp4", encoding.profile())
+
+    assert command[command.index("-c") + 1] == "copy"
+    assert command[command.index("-movflags") + 1] == "+faststart"
+    assert encoding.encode("in.mp4", faststart=True) == "in.mp4"
+
+
+def test_profile_overrides_crf_preset_and_threads(monkeypatch):
+    """
+    Tests that CRF, preset and thread settings reach the x264 encoder.
+    """
+    monkeypatch.setattr(settings, "ENCODING_PROFILE", "web")
+    monkeypatch.setattr(settings, "ENCODING_CRF", 30)
+    monkeypatch.setattr(settings, "ENCODING_PRESET", "ultrafast")
+    monkeypatch.setattr(settings, "ENCODING_THREADS", 2)
+
+    command = encoding.encode_command("in.mp4", "out.mp4", encoding.profile())
+
+    assert command[command.index("-c:v") + 1] == "libx264"
+    assert command[command.index("-crf") + 1] == "30"
+    assert command[command.index("-preset") + 1] == "ultrafast"
+    assert command[command.index("-threads") + 1] == "2"
+    assert "+faststart" in command
+
+
+@pytest.mark.parametrize(
+    ("profile_name", "expected"), [("webm", "libvpx-vp9"), ("gif", "paletteuse")]
+)
+def test_alternative_formats(monkeypatch, profile_name, expected):
+    """
+    Tests that the WebM and GIF profiles select their own encoders.
+    """
+    monkeypatch.setattr(settings, "ENCODING_PROFILE", profile_name)
+    encoding_profile = encoding.profile()
+
+    command = encoding.encode_command("in.mp4", f"out.{profile_name}", encoding_profile)
+
+    assert encoding_profile["format"] == profile_name
+    assert any(expected in argument for argument in command)
+
+
+def test_unknown_profile_is_rejected(monkeypatch):
+    """
+    Tests that a misconfigured encoding profile fails loudly.
+    """
+    monkeypatch.setattr(settings, "ENCODING_PROFILE", "vhs")
+
+    with pytest.raises(ValueError):
+        encoding.profile()
+
+
+def test_encode_timeout_fails_like_an_encoder_error(monkeypatch):
+    """
+    Tests that an ffmpeg transcode that times out raises a RenderError.
+    """
+    monkeypatch.setattr(settings, "ENCODING_PROFILE", "web")
+
+    def hang(command, **kwargs):
+        raise subprocess.TimeoutExpired(command, kwargs["timeout"])
+
+    monkeypatch.setattr(encoding.subprocess, "run", hang)
+
+    with pytest.raises(RenderError):
+        encoding.encode("/tmp/scene.mp4")
@@ -0,0 +1,53 @@
+import os
+import time
+
+from rendering_service import media_cache
+from rendering_service.core.config import settings
+
+
+def _fill(path, size):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "partial.mp4"), "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_quota_evicts_least_recently_used_sources(tmp_path, monkeypatch):
+    """
+    Tests that eviction removes the oldest unused source caches first.
+    """
+    monkeypatch.setattr(settings, "MEDIA_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MEDIA_CACHE_QUOTA_MB", 10)
+
+    old = media_cache.acquire("old-source")
+    in_use = media_cache.acquire("busy-source")
+    recent = media_cache.acquire("recent-source")
+    for path in (old, in_use, recent):
+        _fill(path, 400 * 1024)
+    media_cache.release("old-source")
+    media_cache.release("recent-source")
+
+    stale = time.time() - 3600
+    os.utime(old, (stale, stale))
+    os.utime(in_use, (stale - 60, stale - 60))
+
+    monkeypatch.setattr(settings, "MEDIA_CACHE_QUOTA_MB", 1)
+    media_cache.enforce_quota()
+
+    assert not os.path.exists(old)
+    assert os.path.isdir(in_use)
+    assert os.path.isdir(recent)
+    media_cache.release("busy-source")
+
+
+def test_render_overrides_share_tex_and_scope_partials(tmp_path, monkeypatch):
+    """
+    Tests that Tex output is shared while partial movies are per source.
+    """
+    monkeypatch.setattr(settings, "MEDIA_CACHE_DIR", str(tmp_path))
+
+    first = media_cache.render_overrides("canvas-1")
+    second = media_cache.render_overrides("canvas-2")
+
+    assert first["tex_dir"] == second["tex_dir"]
+    assert first["partial_movie_dir"] != second["partial_movie_dir"]
+    assert "partial_movie_dir" not in media_cache.render_overrides(None)
@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from rendering_service import metrics, services
+from rendering_service.main import app
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_timed_step_labels_outcome():
+    """
+    Tests that timed steps record success and error outcomes separately.
+    """
+    success = _sample("rendering_step_seconds_count", step="test", outcome="success")
+    error = _sample("rendering_step_seconds_count", step="test", outcome="error")
+
+    with metrics.timed_step("test"):
+        pass
+    with pytest.raises(RuntimeError), metrics.timed_step("test"):
+        raise RuntimeError("boom")
+
+    assert (
+        _sample("rendering_step_seconds_count", step="test", outcome="success")
+        == success + 1
+    )
+    assert (
+        _sample("rendering_step_seconds_count", step="test", outcome="error")
+        == error + 1
+    )
+
+
+def test_metrics_endpoint_exposes_pool_utilization(monkeypatch):
+    """
+    Tests that the metrics endpoint serves Prometheus text with pool gauges.
+    """
+
+    class FakePool:
+        def stats(self):
+            return {"size": 4, "busy": 1, "jobs_per_minute": 0.0}
+
+    monkeypatch.setattr(services, "render_pool", FakePool())
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "rendering_pool_utilization 0.25" in response.text
+    assert "rendering_jobs_in_flight" in response.text
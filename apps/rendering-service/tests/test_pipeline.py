@@ -0,0 +1,278 @@
+import pytest
+from dropbox.exceptions import RateLimitError
+from render_analysis import analysis
+
+from rendering_service import (
+    cancellation,
+    code_store,
+    encoding,
+    render_cache,
+    services,
+)
+from rendering_service.core.config import settings
+from rendering_service.pipeline import RenderJob, RenderPipeline
+
+SAMPLE_CODE = """
+from manim import *
+
+class MyFirstScene(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+"""
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RENDER_SCRATCH_DIR", str(tmp_path))
+    monkeypatch.setattr(render_cache, "lookup", lambda key: None)
+    monkeypatch.setattr(render_cache, "store_success", lambda *args: None)
+    monkeypatch.setattr(encoding, "encode", lambda path, faststart=False: path)
+    monkeypatch.setattr(encoding, "extract_poster", lambda path: None)
+    monkeypatch.setattr(
+        services,
+        "preflight_scenes",
+        lambda code, scene_names, media_dir, options: dict.fromkeys(scene_names, 1),
+    )
+    published = []
+    monkeypatch.setattr(services, "publish_redis_message", published.append)
+    monkeypatch.setattr(
+        services,
+        "render_video",
+        lambda code, scene_name, media_dir, quality, *args: f"{media_dir}/{quality}",
+    )
+    render_pipeline = RenderPipeline()
+    render_pipeline.published = published
+    render_pipeline.start()
+    yield render_pipeline
+    render_pipeline.stop()
+
+
+def _job(job_id):
+    return RenderJob(job_id=job_id, user_id="user-1", code=SAMPLE_CODE)
+
+
+def test_pipeline_publishes_success_for_each_job(pipeline, monkeypatch):
+    """
+    Tests that jobs flow through render, upload and notify and are acked.
+    """
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, scene: f"https://videos/{job_id}.mp4",
+    )
+
+    futures = [pipeline.submit(_job(f"job-{i}")) for i in range(3)]
+
+    assert all(future.result(timeout=5) for future in futures)
+    assert sorted(p["video_url"] for p in pipeline.published) == [
+        "https://videos/job-0.mp4",
+        "https://videos/job-1.mp4",
+        "https://videos/job-2.mp4",
+    ]
+    assert pipeline.stats()["upload"]["processed"] == 3
+
+
+def test_shipped_analysis_skips_parsing(pipeline, monkeypatch):
+    """
+    Tests that a job carrying the publisher's analysis record is not re-parsed.
+    """
+    attributes = analysis.to_attributes(analysis.analyze(SAMPLE_CODE))
+    monkeypatch.setattr(services, "analyze_code", pytest.fail)
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, scene: f"https://videos/{scene}.mp4",
+    )
+    job = _job("job-1")
+    job.code_analysis = analysis.from_attributes(attributes)
+
+    assert pipeline.submit(job).result(timeout=5)
+    assert pipeline.published[0]["video_url"] == "https://videos/MyFirstScene.mp4"
+
+
+def test_cache_hits_skip_the_render_stage(pipeline, monkeypatch):
+    """
+    Tests that cached results and failures are published without a render slot.
+    """
+    hit, failed = _job("job-hit"), _job("job-failed")
+    failed.quality = "medium_quality"
+    for job in (hit, failed):
+        job.code_analysis = analysis.analyze(SAMPLE_CODE)
+    cached = {
+        "low_quality": {"status": "success", "video_url": "https://videos/hit.mp4"},
+        "medium_quality": {"status": "failure", "error": "Scene raised an error."},
+    }
+    monkeypatch.setattr(
+        render_cache,
+        "lookup",
+        lambda key: cached[hit.quality if key == hit.cache_key else failed.quality],
+    )
+    monkeypatch.setattr(services, "render_video", pytest.fail)
+
+    futures = [pipeline.submit(hit), pipeline.submit(failed)]
+
+    assert all(future.result(timeout=5) for future in futures)
+    assert sorted(
+        (p["status"], p.get("video_url") or p.get("error")) for p in pipeline.published
+    ) == [
+        ("failure", "Scene raised an error."),
+        ("success", "https://videos/hit.mp4"),
+    ]
+    assert pipeline.stats()["render"]["processed"] == 0
+
+
+def test_hash_only_job_loads_code_from_store(pipeline, monkeypatch):
+    """
+    Tests that hash-only jobs render stored code and fail once it has expired.
+    """
+    record = analysis.analyze(SAMPLE_CODE)
+    stored = {record["code_hash"]: SAMPLE_CODE}
+    monkeypatch.setattr(code_store, "fetch", stored.get)
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, scene: f"https://videos/{job_id}.mp4",
+    )
+    first = RenderJob(job_id="job-1", user_id="user-1", code=None)
+    first.code_analysis = record
+
+    assert pipeline.submit(first).result(timeout=5)
+    stored.clear()
+    second = RenderJob(job_id="job-2", user_id="user-1", code=None)
+    second.code_analysis = record
+    assert pipeline.submit(second).result(timeout=5)
+
+    assert first.code == SAMPLE_CODE
+    assert pipeline.published[0]["status"] == "success"
+    assert pipeline.published[1]["status"] == "failure"
+    assert "no longer available" in pipeline.published[1]["error"]
+
+
+def test_preflight_failure_skips_the_full_render(pipeline, monkeypatch):
+    """
+    Tests that a scene failing its preflight is reported without rendering.
+    """
+
+    def failing_preflight(code, scene_names, media_dir, options):
+        raise services.RenderError("Manim rendering for scene failed: bad color")
+
+    monkeypatch.setattr(services, "preflight_scenes", failing_preflight)
+    monkeypatch.setattr(services, "render_video", pytest.fail)
+
+    assert pipeline.submit(_job("job-1")).result(timeout=5)
+    assert pipeline.published[0]["status"] == "failure"
+    assert "bad color" in pipeline.published[0]["error"]
+
+
+def test_progressive_job_publishes_preview_then_final(pipeline, monkeypatch):
+    """
+    Tests that a progressive job publishes a preview before the final render.
+    """
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, label: f"https://videos/{label}.mp4",
+    )
+    job = _job("job-progressive")
+    job.quality = services.PREVIEW_QUALITY
+    job.variant = "preview"
+
+    assert pipeline.submit(job).result(timeout=5) is True
+    assert [p["variant"] for p in pipeline.published] == ["preview", "final"]
+    assert pipeline.published[0]["video_url"] == (
+        "https://videos/MyFirstScene_preview.mp4"
+    )
+    assert pipeline.published[1]["video_url"] == "https://videos/MyFirstScene.mp4"
+
+
+def test_multi_scene_job_uploads_each_scene_separately(pipeline, monkeypatch):
+    """
+    Tests that separate scene output publishes one link per scene.
+    """
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, label: f"https://videos/{label}.mp4",
+    )
+    job = _job("job-multi")
+    job.code = SAMPLE_CODE + SAMPLE_CODE.replace("MyFirstScene", "MySecondScene")
+    job.scene_output = "separate"
+
+    assert pipeline.submit(job).result(timeout=5) is True
+    assert pipeline.published[0]["video_urls"] == [
+        {"scene_name": "MyFirstScene", "video_url": "https://videos/MyFirstScene.mp4"},
+        {
+            "scene_name": "MySecondScene",
+            "video_url": "https://videos/MySecondScene.mp4",
+        },
+    ]
+
+
+def test_pipeline_publishes_poster_link(pipeline, monkeypatch):
+    """
+    Tests that the poster frame is uploaded and linked in the success payload.
+    """
+    monkeypatch.setattr(encoding, "extract_poster", lambda path: f"{path}.jpg")
+    monkeypatch.setattr(
+        services,
+        "upload_and_get_link",
+        lambda path, source_id, job_id, label: f"https://videos/{label}",
+    )
+
+    assert pipeline.submit(_job("job-poster")).result(timeout=5) is True
+    assert pipeline.published[0]["video_url"] == "https://videos/MyFirstScene"
+    assert pipeline.published[0]["poster_url"] == ("https://videos/MyFirstScene_poster")
+
+
+def test_superseded_job_publishes_its_status(pipeline, monkeypatch):
+    """
+    Tests that a job replaced by a newer request is not rendered but reported.
+    """
+    rendered = []
+    monkeypatch.setattr(cancellation, "is_superseded", lambda job: True)
+    monkeypatch.setattr(
+        services, "render_video", lambda *args: rendered.append(args) or "video"
+    )
+
+    assert pipeline.submit(_job("job-old")).result(timeout=5) is True
+    assert rendered == []
+    assert [(p["status"], p["cpu_seconds"]) for p in pipeline.published] == [
+        ("superseded", 0.0)
+    ]
+
+
+def test_payload_reports_cpu_seconds(pipeline, monkeypatch):
+    """
+    Tests that CPU time reported by the pool is summed into the payload.
+    """
+
+    def preflight(code, scene_names, media_dir, options):
+        options.on_cpu_seconds(1.5)
+        return dict.fromkeys(scene_names, 1)
+
+    def render(code, scene_name, media_dir, quality, options):
+        options.on_cpu_seconds(2.25)
+        return f"{media_dir}/{quality}"
+
+    monkeypatch.setattr(services, "preflight_scenes", preflight)
+    monkeypatch.setattr(services, "render_video", render)
+    monkeypatch.setattr(
+        services, "upload_and_get_link", lambda *args: "https://videos/cpu.mp4"
+    )
+
+    assert pipeline.submit(_job("job-cpu")).result(timeout=5) is True
+    assert pipeline.published[0]["cpu_seconds"] == 3.75
+
+
+def test_pipeline_nacks_retryable_upload_errors(pipeline, monkeypatch):
+    """
+    Tests that retryable storage errors nack the message without publishing.
+    """
+
+    def failing_upload(*args):
+        raise RateLimitError("request-1")
+
+    monkeypatch.setattr(services, "upload_and_get_link", failing_upload)
+
+    assert pipeline.submit(_job("job-retry")).result(timeout=5) is False
+    assert pipeline.published == []
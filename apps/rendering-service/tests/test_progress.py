@@ -0,0 +1,25 @@
+from rendering_service import services
+from rendering_service.core.config import settings
+from rendering_service.pipeline import RenderJob
+from rendering_service.progress import ProgressReporter
+
+
+def test_progress_reporter_throttles_and_caps_percent(monkeypatch):
+    """
+    Tests that progress events are throttled and never report completion early.
+    """
+    published = []
+    monkeypatch.setattr(services, "publish_progress_message", published.append)
+    monkeypatch.setattr(settings, "PROGRESS_MIN_INTERVAL_SECONDS", 0)
+    reporter = ProgressReporter(RenderJob(job_id="job-1", user_id="u", code=""), 2)
+
+    reporter({"scene_name": "LoopScene", "animation": "Create", "skipped": True})
+    for _ in range(3):
+        reporter({"scene_name": "LoopScene", "animation": "Create", "skipped": False})
+
+    assert [p["animation_index"] for p in published] == [1, 2, 3]
+    assert [p["percent"] for p in published] == [50.0, 99.0, 99.0]
+
+    monkeypatch.setattr(settings, "PROGRESS_MIN_INTERVAL_SECONDS", 3600)
+    reporter({"scene_name": "LoopScene", "animation": "Create", "skipped": False})
+    assert len(published) == 3
@@ -0,0 +1,73 @@
+import asyncio
+
+from redis.exceptions import ConnectionError
+
+from rendering_service.core.config import settings
+from rendering_service.publisher import RedisPublisher
+
+
+class FlakyPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def publish(self, channel, payload):
+        self.commands.append((channel, payload))
+
+    async def execute(self):
+        self.client.executions += 1
+        if self.client.failures:
+            self.client.failures -= 1
+            raise ConnectionError("Valkey is unavailable")
+        self.client.delivered.extend(self.commands)
+
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.executions = 0
+        self.delivered = []
+
+    def pipeline(self, transaction=True):
+        return FlakyPipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+def test_publisher_retries_results_and_drops_progress(monkeypatch):
+    """
+    Tests that results survive a Redis outage while progress updates are dropped.
+    """
+    monkeypatch.setattr(settings, "REDIS_PUBLISH_RETRY_BASE_SECONDS", 0.01)
+    client = FlakyClient(failures=2)
+    publisher = RedisPublisher()
+
+    async def scenario():
+        await publisher.start(client)
+        publisher.publish("video_links", {"job_id": "job-1"})
+        publisher.publish("render_progress", {"percent": 10}, durable=False)
+        publisher.publish("video_links", {"job_id": "job-2"})
+        await publisher.stop()
+
+    asyncio.run(scenario())
+
+    assert client.delivered == [
+        ("video_links", '{"job_id": "job-1"}'),
+        ("video_links", '{"job_id": "job-2"}'),
+    ]
+    assert client.executions == 3
+    assert publisher.stats()["dropped"] == 1
+
+
+def test_publisher_rejects_messages_when_not_running():
+    """
+    Tests that publishing without a running event loop reports failure.
+    """
+    assert RedisPublisher().publish("video_links", {"job_id": "job-1"}) is False
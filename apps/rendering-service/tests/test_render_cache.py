@@ -0,0 +1,96 @@
+import json
+import time
+
+from render_analysis import analysis
+
+from rendering_service import render_cache, services
+from rendering_service.core.config import settings
+
+SAMPLE_CODE = """
+from manim import *
+
+class MyFirstScene(Scene):
+    def construct(self):
+        circle = Circle()
+        self.play(Create(circle))
+"""
+
+SAMPLE_CODE_REFORMATTED = """
+from manim import *
+
+
+class MyFirstScene(Scene):
+    # Draw a circle
+    def construct(self):
+        circle = Circle( )
+        self.play(Create(circle))  # animate it
+"""
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+def test_cache_key_ignores_formatting_and_comments():
+    """
+    Tests that code differing only in whitespace and comments shares a key.
+    """
+    key = render_cache.make_cache_key(
+        analysis.code_hash(SAMPLE_CODE), "MyFirstScene", "low_quality"
+    )
+    reformatted_key = render_cache.make_cache_key(
+        analysis.code_hash(SAMPLE_CODE_REFORMATTED), "MyFirstScene", "low_quality"
+    )
+    assert key == reformatted_key
+
+
+def test_cache_key_depends_on_scene_and_quality():
+    """
+    Tests that the scene name and render quality are part of the cache key.
+    """
+    code_hash = analysis.code_hash(SAMPLE_CODE)
+    key = render_cache.make_cache_key(code_hash, "MyFirstScene", "low_quality")
+    assert key != render_cache.make_cache_key(code_hash, "OtherScene", "low_quality")
+    assert key != render_cache.make_cache_key(code_hash, "MyFirstScene", "high_quality")
+
+
+def test_cache_round_trip(monkeypatch):
+    """
+    Tests that stored successes and failures are returned by lookup.
+    """
+    monkeypatch.setattr(services, "redis_client", FakeRedis())
+
+    render_cache.store_success("ok", "https://example.com/video.mp4")
+    render_cache.store_failure("bad", "Manim rendering failed.")
+
+    assert render_cache.lookup("ok")["video_url"] == "https://example.com/video.mp4"
+    assert render_cache.lookup("bad")["status"] == "failure"
+    assert render_cache.lookup("missing") is None
+
+
+def test_cache_skips_links_close_to_storage_cleanup(monkeypatch):
+    """
+    Tests that cached links about to be deleted from storage are not reused.
+    """
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(services, "redis_client", fake_redis)
+    uploaded_at = time.time() - settings.STORAGE_RETENTION_SECONDS + 60
+    fake_redis.set(
+        "old",
+        json.dumps(
+            {"status": "success", "video_url": "https://x", "uploaded_at": uploaded_at}
+        ),
+    )
+    fake_redis.set(
+        "legacy", json.dumps({"status": "success", "video_url": "https://y"})
+    )
+
+    assert render_cache.lookup("old") is None
+    assert render_cache.lookup("legacy") is None
@@ -0,0 +1,139 @@
+import time
+
+from rendering_service import cost_model
+from rendering_service.core.config import settings
+from rendering_service.pipeline import PRIORITY_BACKGROUND, RenderJob
+from rendering_service.scheduler import FairJobQueue
+
+
+def _job(job_id, cost, entered_at, user_id="user-1"):
+    job = RenderJob(job_id=job_id, user_id=user_id, code="", render_cost=cost)
+    job.stage_entered_at = entered_at
+    return job
+
+
+def test_cost_model_calibrates_against_measured_render_times(monkeypatch):
+    """
+    Tests that observed render times pull the per-quality calibration.
+    """
+    monkeypatch.setattr(cost_model, "_seconds_per_unit", {})
+    monkeypatch.setattr(cost_model, "_samples", {})
+    monkeypatch.setattr(settings, "RENDER_COST_CALIBRATION_ALPHA", 0.5)
+
+    cost_model.observe("low_quality", 10.0, 30.0)
+    cost_model.observe("low_quality", 10.0, 10.0)
+
+    assert cost_model.predict_seconds(10.0, "low_quality") == 20.0
+    assert cost_model.stats()["low_quality"]["samples"] == 2
+
+
+def test_time_limit_scales_with_estimated_cost(monkeypatch):
+    """
+    Tests that the render time limit follows the cost estimate within bounds once
+    the quality is calibrated, and that a killed render only raises the estimate.
+    """
+    monkeypatch.setattr(cost_model, "_seconds_per_unit", {"low_quality": 2.0})
+    monkeypatch.setattr(cost_model, "_samples", {"low_quality": 4})
+    monkeypatch.setattr(settings, "RENDER_TIMEOUT_COST_HEADROOM", 5.0)
+    monkeypatch.setattr(settings, "RENDER_TIMEOUT_MIN_SECONDS", 60)
+    monkeypatch.setattr(settings, "RENDER_TIMEOUT_SECONDS", 600)
+    monkeypatch.setattr(settings, "RENDER_TIMEOUT_MIN_CALIBRATION_SAMPLES", 5)
+
+    assert cost_model.time_limit(20.0, "low_quality") == 600
+
+    cost_model._samples["low_quality"] = 5
+    assert cost_model.time_limit(1.0, "low_quality") == 60
+    assert cost_model.time_limit(20.0, "low_quality") == 200.0
+    assert cost_model.time_limit(500.0, "low_quality") == 600
+    assert cost_model.time_limit(0.0, "low_quality") == 600
+
+    cost_model.observe_timeout("low_quality", 20.0, 20.0)
+    assert cost_model.seconds_per_unit("low_quality") == 2.0
+    cost_model.observe_timeout("low_quality", 20.0, 200.0)
+    assert cost_model.time_limit(20.0, "low_quality") == 600
+
+
+def test_render_queue_runs_shortest_job_first_with_aging(monkeypatch):
+    """
+    Tests that short jobs overtake long ones until the long job has aged enough.
+    """
+    monkeypatch.setattr(cost_model, "_seconds_per_unit", {})
+    monkeypatch.setattr(settings, "RENDER_COST_SECONDS_PER_UNIT", 1.0)
+    monkeypatch.setattr(settings, "SCHEDULER_AGING_RATE", 1.0)
+    monkeypatch.setattr(settings, "RENDER_MAX_IN_FLIGHT_PER_USER", None)
+    job_queue = FairJobQueue()
+
+    job_queue.put(_job("long", 600.0, entered_at=0.0))
+    job_queue.put(_job("short", 5.0, entered_at=10.0))
+    job_queue.put(_job("late-short", 5.0, entered_at=1000.0))
+
+    assert [job_queue.get().job_id for _ in range(3)] == [
+        "short",
+        "long",
+        "late-short",
+    ]
+
+
+def test_render_queue_round_robins_between_users(monkeypatch):
+    """
+    Tests that a burst from one user does not delay another user's job.
+    """
+    monkeypatch.setattr(cost_model, "_seconds_per_unit", {})
+    monkeypatch.setattr(settings, "RENDER_COST_SECONDS_PER_UNIT", 1.0)
+    monkeypatch.setattr(settings, "FAIR_QUEUE_QUANTUM_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "RENDER_MAX_IN_FLIGHT_PER_USER", 10)
+    job_queue = FairJobQueue()
+    for index in range(5):
+        job_queue.put(_job(f"burst-{index}", 10.0, entered_at=index, user_id="heavy"))
+    job_queue.put(_job("light", 10.0, entered_at=10.0, user_id="light"))
+
+    order = [job_queue.get().job_id for _ in range(6)]
+
+    assert order.index("light") == 1
+    assert job_queue.user_stats()["light"]["in_flight"] == 1
+
+
+def test_render_queue_drains_interactive_before_background_across_users(monkeypatch):
+    """
+    Tests that interactive jobs from any user run before queued background jobs
+    until the background jobs have waited past the priority aging limit.
+    """
+    monkeypatch.setattr(cost_model, "_seconds_per_unit", {})
+    monkeypatch.setattr(settings, "RENDER_COST_SECONDS_PER_UNIT", 1.0)
+    monkeypatch.setattr(settings, "RENDER_MAX_IN_FLIGHT_PER_USER", 10)
+    monkeypatch.setattr(settings, "SCHEDULER_PRIORITY_AGING_SECONDS", 60.0)
+    now = time.monotonic()
+    job_queue = FairJobQueue()
+    background = _job("background", 1.0, entered_at=now, user_id="batch")
+    background.priority = PRIORITY_BACKGROUND
+    job_queue.put(background)
+    job_queue.put(_job("interactive", 50.0, entered_at=now, user_id="editor"))
+
+    assert [job_queue.get().job_id for _ in range(2)] == ["interactive", "background"]
+
+    stale = _job("stale", 1.0, entered_at=now - 120.0, user_id="batch")
+    stale.priority = PRIORITY_BACKGROUND
+    job_queue.put(stale)
+    job_queue.put(_job("fresh", 1.0, entered_at=now, user_id="editor"))
+
+    assert job_queue.get().job_id == "stale"
+
+
+def test_render_queue_enforces_per_user_in_flight_cap(monkeypatch):
+    """
+    Tests that a user at the in-flight cap waits until one of their jobs ends.
+    """
+    monkeypatch.setattr(settings, "RENDER_MAX_IN_FLIGHT_PER_USER", 1)
+    job_queue = FairJobQueue()
+    first = _job("first", 1.0, entered_at=0.0, user_id="heavy")
+    job_queue.put(first)
+    job_queue.put(_job("second", 1.0, entered_at=1.0, user_id="heavy"))
+    job_queue.put(_job("other", 50.0, entered_at=2.0, user_id="light"))
+
+    assert job_queue.get() is first
+    assert job_queue.get().job_id == "other"
+    job_queue.put(None)
+    assert job_queue.get() is None
+
+    job_queue.release(first)
+    assert job_queue.get().job_id == "second"
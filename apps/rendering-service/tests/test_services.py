@@ -1,6 +1,7 @@
 import pytest
 
 from rendering_service import services
+from rendering_service.worker_pool import RenderTimeoutError
 
 SAMPLE_CODE_VALID = """
 from manim import *
@@ -35,3 +36,134 @@ def test_extract_first_scene_name_failure():
         ValueError, match="Could not find any class inheriting from 'Scene'"
     ):
         services.extract_first_scene_name(SAMPLE_CODE_NO_SCENE)
+
+
+SAMPLE_CODE_MULTIPLE_SCENES = """
+import manim
+from manim import *
+
+class Intro(Scene):
+    def construct(self):
+        self.play(Write(Text("Hello")))
+
+class Helper:
+    pass
+
+class Orbit(manim.ThreeDScene):
+    def construct(self):
+        self.play(Create(Sphere()))
+
+class OrbitZoomed(Orbit):
+    pass
+"""
+
+
+def test_extract_scene_names_finds_every_scene():
+    """
+    Tests that all Scene subclasses are discovered in definition order.
+    """
+    scene_names = services.extract_scene_names(SAMPLE_CODE_MULTIPLE_SCENES)
+    assert scene_names == ["Intro", "Orbit", "OrbitZoomed"]
+
+
+def test_extract_scene_names_rejects_syntax_errors():
+    """
+    Tests that code which does not parse raises a ValueError.
+    """
+    with pytest.raises(ValueError, match="syntax error"):
+        services.extract_scene_names("class Broken(Scene:\n    pass")
+
+
+def test_plan_segments_splits_animations_evenly(monkeypatch):
+    """
+    Tests that animation ranges are contiguous, disjoint and cover the scene.
+    """
+    monkeypatch.setattr(services.settings, "SEGMENT_MIN_ANIMATIONS", 4)
+
+    assert services.plan_segments(10, 4) == [(0, 4), (5, 9)]
+    assert services.plan_segments(24, 3) == [(0, 7), (8, 15), (16, 23)]
+    assert services.plan_segments(5, 8) == []
+
+
+class FakePool:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def render(self, job, timeout, on_progress=None, should_cancel=None):
+        self.calls.append((job["scene_name"], job.get("dry_run", False), timeout))
+        result = self.results[job["scene_name"]]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_preflight_counts_animations_and_fails_fast(monkeypatch, tmp_path):
+    """
+    Tests that preflight dry runs use the short timeout and surface failures.
+    """
+    pool = FakePool(
+        {
+            "Intro": {
+                "ok": True,
+                "animation_count": 4,
+                "render_seconds": 0.1,
+                "cpu_seconds": 0.5,
+            },
+            "Broken": {
+                "ok": False,
+                "error": "Unknown symbol",
+                "traceback": "",
+                "render_seconds": 0.1,
+            },
+            "Endless": RenderTimeoutError("Render exceeded the time limit."),
+        }
+    )
+    monkeypatch.setattr(services, "render_pool", pool)
+    charged = []
+    options = services.RenderOptions(on_cpu_seconds=charged.append)
+
+    counts = services.preflight_scenes("code", ["Intro"], str(tmp_path), options)
+
+    assert counts == {"Intro": 4}
+    assert pool.calls == [("Intro", True, services.settings.PREFLIGHT_TIMEOUT_SECONDS)]
+    with pytest.raises(services.RenderError, match="Unknown symbol"):
+        services.preflight_scenes("code", ["Intro", "Broken"], str(tmp_path), options)
+    with pytest.raises(RenderTimeoutError, match="preflight check"):
+        services.preflight_scene("code", "Endless", str(tmp_path), options)
+    assert charged[0] == 0.5
+    assert charged[-1] == services.settings.PREFLIGHT_TIMEOUT_SECONDS
+
+
+def test_segments_get_their_own_partial_movie_dirs(monkeypatch, tmp_path):
+    """
+    Tests that parallel segments of one scene never share a partials directory.
+    """
+    jobs = []
+
+    class RecordingPool:
+        def render(self, job, timeout, on_progress=None, should_cancel=None):
+            jobs.append(job)
+            video_path = tmp_path / f"{job['output_name']}.mp4"
+            video_path.touch()
+            return {"ok": True, "video_path": str(video_path), "render_seconds": 0.1}
+
+        def jobs_per_minute(self):
+            return 0.0
+
+    monkeypatch.setattr(services, "render_pool", RecordingPool())
+    monkeypatch.setattr(services.settings, "MEDIA_CACHE_ENABLED", True)
+    monkeypatch.setattr(services.settings, "MEDIA_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(services.settings, "SEGMENT_MIN_ANIMATIONS", 2)
+    monkeypatch.setattr(services, "concatenate_videos", lambda paths, output: output)
+    options = services.RenderOptions(
+        source_id="canvas-1", segments=3, animation_counts={"MyFirstScene": 6}
+    )
+
+    services.render_video_segmented(
+        SAMPLE_CODE_VALID, "MyFirstScene", str(tmp_path), "low_quality", options
+    )
+
+    partial_dirs = {job["render_config"]["partial_movie_dir"] for job in jobs}
+    assert len(jobs) == 3
+    assert len(partial_dirs) == 3
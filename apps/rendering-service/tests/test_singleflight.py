@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from rendering_service import render_cache, services, singleflight
+from rendering_service.core.config import settings
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value
+            return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        with self.lock:
+            if self.store.get(key) != token:
+                return 0
+            if script == singleflight._RELEASE_SCRIPT:
+                del self.store[key]
+            return 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(services, "redis_client", redis)
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS", 5)
+    return redis
+
+
+def _waiting_room():
+    resumed = []
+    room = singleflight.WaitingRoom(
+        lambda job, lease, cached: resumed.append((job, lease, cached))
+    )
+    return room, resumed
+
+
+def test_follower_reuses_the_leader_result(fake_redis):
+    """
+    Tests that a parked follower is resumed with the leader's cached result.
+    """
+    lease, cached = singleflight.try_lead("key")
+    assert lease is not None and cached is None
+    assert singleflight.try_lead("key") == (None, None)
+    room, resumed = _waiting_room()
+    room.park("key", "follower")
+
+    room.poll()
+    assert resumed == []
+
+    render_cache.store_success("key", "https://videos/leader.mp4")
+    lease.release()
+    room.poll()
+
+    assert [(job, lease) for job, lease, _ in resumed] == [("follower", None)]
+    assert resumed[0][2]["video_url"] == "https://videos/leader.mp4"
+    assert room.size() == 0
+
+
+def test_follower_takes_over_when_the_lease_expires(fake_redis):
+    """
+    Tests that one follower leads once a crashed leader's lease expires.
+    """
+    lease, _ = singleflight.try_lead("key")
+    lease._released.set()
+    room, resumed = _waiting_room()
+    room.park("key", "first")
+    room.park("key", "second")
+
+    fake_redis.store.pop(singleflight.lease_key("key"))
+    room.poll()
+
+    assert [job for job, _, _ in resumed] == ["first"]
+    follower_lease = resumed[0][1]
+    assert fake_redis.get(singleflight.lease_key("key")) == follower_lease.token
+    assert room.size() == 1
+    follower_lease.release()
+
+
+def test_release_keeps_a_lease_taken_over_by_another_instance(fake_redis):
+    """
+    Tests that releasing an expired lease does not delete its new owner's lease.
+    """
+    lease, _ = singleflight.try_lead("key")
+    fake_redis.store[singleflight.lease_key("key")] = "other-instance"
+
+    lease.release()
+
+    assert fake_redis.get(singleflight.lease_key("key")) == "other-instance"
@@ -0,0 +1,78 @@
+import tracemalloc
+from types import SimpleNamespace
+
+from rendering_service import storage
+from rendering_service.core.config import settings
+
+MB = 1024 * 1024
+
+
+class FakeDropboxClient:
+    def __init__(self):
+        self.bytes_received = 0
+        self.calls = []
+
+    def files_upload(self, data, path, mode=None):
+        self.calls.append("upload")
+        self.bytes_received += len(data)
+
+    def files_upload_session_start(self, data):
+        self.calls.append("start")
+        self.bytes_received += len(data)
+        return SimpleNamespace(session_id="session-1")
+
+    def files_upload_session_append_v2(self, data, cursor):
+        self.calls.append("append")
+        assert cursor.offset == self.bytes_received
+        self.bytes_received += len(data)
+
+    def files_upload_session_finish(self, data, cursor, commit):
+        self.calls.append("finish")
+        assert cursor.offset == self.bytes_received
+        self.bytes_received += len(data)
+
+
+def _make_video(tmp_path, size):
+    path = tmp_path / f"video_{size}.mp4"
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return str(path)
+
+
+def _peak_upload_memory(file_path):
+    client = FakeDropboxClient()
+    tracemalloc.start()
+    try:
+        storage.upload_file_in_chunks(client, file_path, "/video.mp4")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return client, peak
+
+
+def test_small_file_uses_single_upload(tmp_path, monkeypatch):
+    """
+    Tests that files within one chunk are uploaded with a single call.
+    """
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE_MB", 1)
+    client, _ = _peak_upload_memory(_make_video(tmp_path, MB // 2))
+    assert client.calls == ["upload"]
+    assert client.bytes_received == MB // 2
+
+
+def test_chunked_upload_memory_stays_flat(tmp_path, monkeypatch):
+    """
+    Tests that peak memory during upload is bounded by the chunk size and does
+    not grow with the size of the video.
+    """
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE_MB", 1)
+
+    small_client, small_peak = _peak_upload_memory(_make_video(tmp_path, 4 * MB))
+    large_client, large_peak = _peak_upload_memory(_make_video(tmp_path, 32 * MB))
+
+    assert small_client.bytes_received == 4 * MB
+    assert large_client.bytes_received == 32 * MB
+    assert large_client.calls[0] == "start"
+    assert large_client.calls[-1] == "finish"
+    assert large_peak < 2 * MB
+    assert large_peak < small_peak * 1.5
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import resource
+import signal
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rendering_service import worker_pool
+
+LEAKED = {"patched": False}
+
+
+def _run_isolated(job):
+    parent_conn, child_conn = multiprocessing.Pipe()
+    worker_pool._run_isolated(child_conn, job)
+    assert "started" in parent_conn.recv()
+    return parent_conn.recv()
+
+
+def test_jobs_run_in_a_fresh_process(monkeypatch):
+    """
+    Tests that state changed by one job is not visible to the next job.
+    """
+
+    def patching_job(job, report=None):
+        seen = LEAKED["patched"]
+        LEAKED["patched"] = True
+        return {"ok": True, "seen_patched": seen, "render_seconds": 0.0}
+
+    monkeypatch.setattr(worker_pool, "_run_job", patching_job)
+
+    assert _run_isolated({})["seen_patched"] is False
+    assert _run_isolated({})["seen_patched"] is False
+    assert LEAKED["patched"] is False
+
+
+def test_crashed_job_reports_a_failure(monkeypatch):
+    """
+    Tests that a job process dying without a result is reported as a failure.
+    """
+
+    def crashing_job(job, report=None):
+        raise SystemExit(3)
+
+    monkeypatch.setattr(worker_pool, "_run_job", crashing_job)
+
+    result = _run_isolated({})
+
+    assert result["ok"] is False
+    assert "exit code 1" in result["error"]
+
+
+def test_job_limits_apply_only_to_the_job_process(monkeypatch, tmp_path):
+    """
+    Tests that rlimits are set in the job process and failures name the limit.
+    """
+
+    def oversized_job(job, report=None):
+        try:
+            (tmp_path / "out.bin").write_bytes(b"x" * 2 * 1024 * 1024)
+        except OSError as e:
+            return {"ok": False, "limit": worker_pool._exceeded_limit(e, job["limits"])}
+        return {"ok": True}
+
+    monkeypatch.setattr(worker_pool, "_run_job", oversized_job)
+    before = resource.getrlimit(resource.RLIMIT_FSIZE)
+
+    result = _run_isolated({"limits": {"memory_mb": None, "file_size_mb": 1}})
+
+    assert result == {"ok": False, "limit": "file_size"}
+    assert resource.getrlimit(resource.RLIMIT_FSIZE) == before
+
+
+def test_killed_job_reports_a_likely_memory_kill(monkeypatch):
+    """
+    Tests that a job killed by SIGKILL is reported as an out-of-memory kill.
+    """
+
+    def killed_job(job, report=None):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    monkeypatch.setattr(worker_pool, "_run_job", killed_job)
+
+    result = _run_isolated({})
+
+    assert result["limit"] == "oom_kill"
+    assert "out of memory" in result["error"]
+
+
+def test_cancelled_render_kills_only_the_job_process(monkeypatch):
+    """
+    Tests that cancelling a render stops the job but keeps its worker alive.
+    """
+
+    def slow_job(job, report=None):
+        time.sleep(30)
+
+    monkeypatch.setattr(worker_pool, "_run_job", slow_job)
+    ctx = multiprocessing.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe()
+    worker_process = ctx.Process(
+        target=worker_pool._run_isolated, args=(child_conn, {})
+    )
+    worker_process.start()
+    worker = SimpleNamespace(conn=parent_conn, job_pid=None)
+    pool = worker_pool.RenderWorkerPool(
+        size=0, max_jobs_per_worker=1, cancel_check_interval=0.05
+    )
+
+    with pytest.raises(worker_pool.RenderCancelledError):
+        pool._receive_result(
+            worker, 10, None, should_cancel=lambda: worker.job_pid is not None
+        )
+
+    assert worker_pool.RenderWorker.cancel_job(worker) is True
+    worker_process.join(timeout=5)
+    assert worker_process.exitcode == 0
@@ -0,0 +1,37 @@
+import os
+import time
+
+from rendering_service import workspace
+from rendering_service.core.config import settings
+
+
+def test_job_workspaces_are_isolated(tmp_path, monkeypatch):
+    """
+    Tests that each job gets its own directory and releasing it removes only it.
+    """
+    monkeypatch.setattr(settings, "RENDER_SCRATCH_DIR", str(tmp_path))
+
+    first = workspace.create_job_workspace("job-a")
+    second = workspace.create_job_workspace("job-a")
+    assert first != second
+
+    workspace.release_workspace(first)
+    assert not os.path.exists(first)
+    assert os.path.isdir(second)
+
+
+def test_janitor_sweeps_stale_workspaces(tmp_path, monkeypatch):
+    """
+    Tests that the janitor removes workspaces older than the maximum age.
+    """
+    monkeypatch.setattr(settings, "RENDER_SCRATCH_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "WORKSPACE_MAX_AGE_SECONDS", 60)
+
+    stale = workspace.create_job_workspace("stale")
+    fresh = workspace.create_job_workspace("fresh")
+    old = time.time() - 120
+    os.utime(stale, (old, old))
+
+    workspace._sweep_stale()
+    assert not os.path.exists(stale)
+    assert os.path.isdir(fresh)
@@ -9,6 +9,17 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str | None = None
     DB_URL: str | None = None
     REDIS_RL_URL: str | None = None
+    RENDER_STATE_REDIS_URL: str | None = None
+    LATEST_REQUEST_PREFIX: str = "latest_render_request"
+    LATEST_REQUEST_TTL_SECONDS: int = 24 * 60 * 60
+    JOB_ENVELOPE_ENABLED: bool = False
+    JOB_ENVELOPE_COMPRESS_THRESHOLD_BYTES: int = 512
+    CODE_STORE_PREFIX: str = "render_code"
+    CODE_STORE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    COMPUTE_SECONDS_PER_COST_UNIT: float = 2.0
+    COMPUTE_MIN_RESERVATION_SECONDS: float = 5.0
+    COMPUTE_RESERVATION_TTL_SECONDS: int = 2 * 60 * 60
+    COMPUTE_RESERVATION_RETENTION_SECONDS: int = 7 * 24 * 60 * 60
     emulator_host: str | None = None
     INTERNAL_API_SECRET: str
 
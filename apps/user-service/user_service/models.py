@@ -15,6 +15,7 @@ class CanvasResponse(BaseModel):
     title: str
     code: str | None = None
     video_url: str | None = None
+    preview_url: str | None = None
     updated_at: datetime.datetime
     latest_render_at: datetime.datetime | None = None
 
@@ -30,6 +31,7 @@ class PromptResponse(BaseModel):
     prompt_id: uuid.UUID
     code: str | None = None
     video_url: str | None = None
+    preview_url: str | None = None
     updated_at: datetime.datetime
     prompt_text: str
     latest_render_at: datetime.datetime | None = None
@@ -63,6 +65,8 @@ class UserResponse(BaseModel):
     render_daily_limit: int
     prompt_requests_today: int
     render_requests_today: int
+    compute_daily_budget_seconds: float
+    compute_seconds_today: float
     last_request_date: datetime.date | None = None
 
     class Config:
@@ -10,10 +10,11 @@ from db_core.schemas import CanvasCreate, CanvasUpdate
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..dependencies.config import settings
 from ..dependencies.security import get_current_user
 from ..models import CanvasResponse, CanvasSubmissionRequest, JobSubmissionResponse
 from ..services import publish_job
-from ..services.code_validator import is_code_safe
+from ..services.code_validator import check_code
 
 router = APIRouter()
 
@@ -33,15 +34,10 @@ async def get_canvas_for_user(
     return canvas
 
 
-async def check_and_increment_render_limit(session: AsyncSession, user: User) -> bool:
-    today = datetime.datetime.now(datetime.UTC).date()
-
-    if user.last_request_date != today:
-        user.render_requests_today = 0
-        user.prompt_requests_today = 0
-        user.last_request_date = today
-
-    if user.render_requests_today >= user.render_daily_limit:
+async def check_and_increment_render_limit(
+    session: AsyncSession, user: User, reserved_seconds: float
+) -> bool:
+    if not await user_crud.has_compute_budget(session, user, reserved_seconds):
         return False
 
     user.render_requests_today += 1
@@ -49,7 +45,7 @@ async def check_and_increment_render_limit(session: AsyncSession, user: User) ->
     return True
 
 
-async def submit_job(canvas: Canvas):
+async def submit_job(canvas: Canvas, code_analysis: dict):
     try:
         request_time = datetime.datetime.now(datetime.UTC)
         request_time_str = request_time.isoformat()
@@ -62,6 +58,7 @@ async def submit_job(canvas: Canvas):
             "canvas",
             str(canvas.author_id),
             request_time_str,
+            code_analysis,
         )
 
         canvas.latest_render_at = request_time
@@ -115,7 +112,7 @@ async def render_canvas_code(
                 detail="Canvas has no code to render. Please save your code first.",
             )
 
-        is_safe, reason = is_code_safe(canvas.code)
+        is_safe, reason, code_analysis = check_code(canvas.code)
         if not is_safe:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -130,13 +127,24 @@ async def render_canvas_code(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
             )
 
-        if not await check_and_increment_render_limit(session, db_user):
+        reserved_seconds = publish_job.estimate_compute_seconds(code_analysis)
+        if not await check_and_increment_render_limit(
+            session, db_user, reserved_seconds
+        ):
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Render limit exceeded. Please try again tomorrow.",
+                detail="Render compute budget exceeded. Please try again tomorrow.",
             )
 
-        job_response = await submit_job(canvas)
+        job_response = await submit_job(canvas, code_analysis)
+        await user_crud.reserve_compute(
+            session,
+            db_user.user_id,
+            job_response["job_id"],
+            reserved_seconds,
+            settings.COMPUTE_RESERVATION_TTL_SECONDS,
+            settings.COMPUTE_RESERVATION_RETENTION_SECONDS,
+        )
         session.add(canvas)
         await session.commit()
         return JobSubmissionResponse(**job_response)
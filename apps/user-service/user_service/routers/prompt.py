@@ -11,6 +11,7 @@ from db_core.schemas import PromptUpdate
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..dependencies.config import settings
 from ..dependencies.security import get_current_user
 from ..models import (
     JobSubmissionResponse,
@@ -18,7 +19,7 @@ from ..models import (
     PromptSubmissionRequest,
 )
 from ..services import publish_job
-from ..services.code_validator import is_code_safe
+from ..services.code_validator import check_code
 from ..services.generate_code import generate_manim_code
 
 router = APIRouter()
@@ -45,20 +46,19 @@ class LimitType(str, Enum):
 
 
 async def check_and_increment_limit(
-    session: AsyncSession, user: User, limit_type: LimitType
+    session: AsyncSession,
+    user: User,
+    limit_type: LimitType,
+    reserved_seconds: float = 0.0,
 ) -> bool:
-    today = datetime.datetime.now(datetime.UTC).date()
-    if user.last_request_date != today:
-        user.render_requests_today = 0
-        user.prompt_requests_today = 0
-        user.last_request_date = today
+    user_crud.reset_daily_usage(user)
 
     if limit_type == LimitType.GENERATE:
         if user.prompt_requests_today >= user.prompt_daily_limit:
             return False
         user.prompt_requests_today += 1
     elif limit_type == LimitType.RENDER:
-        if user.render_requests_today >= user.render_daily_limit:
+        if not await user_crud.has_compute_budget(session, user, reserved_seconds):
             return False
         user.render_requests_today += 1
 
@@ -66,7 +66,7 @@ async def check_and_increment_limit(
     return True
 
 
-async def submit_job(prompt: Prompt):
+async def submit_job(prompt: Prompt, code_analysis: dict):
     try:
         request_time = datetime.datetime.now(datetime.UTC)
         request_time_str = request_time.isoformat()
@@ -79,6 +79,7 @@ async def submit_job(prompt: Prompt):
             "prompt",
             str(prompt.author_id),
             request_time_str,
+            code_analysis,
         )
 
         prompt.latest_render_at = request_time
@@ -181,7 +182,7 @@ async def render_prompt_code(
                 detail="Prompt has no code to render. Please generate code first.",
             )
 
-        is_safe, reason = is_code_safe(prompt.code)
+        is_safe, reason, code_analysis = check_code(prompt.code)
         if not is_safe:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -197,13 +198,24 @@ async def render_prompt_code(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
             )
 
-        if not await check_and_increment_limit(session, db_user, LimitType.RENDER):
+        reserved_seconds = publish_job.estimate_compute_seconds(code_analysis)
+        if not await check_and_increment_limit(
+            session, db_user, LimitType.RENDER, reserved_seconds
+        ):
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Render limit exceeded.",
+                detail="Render compute budget exceeded.",
             )
 
-        job_response = await submit_job(prompt)
+        job_response = await submit_job(prompt, code_analysis)
+        await user_crud.reserve_compute(
+            session,
+            db_user.user_id,
+            job_response["job_id"],
+            reserved_seconds,
+            settings.COMPUTE_RESERVATION_TTL_SECONDS,
+            settings.COMPUTE_RESERVATION_RETENTION_SECONDS,
+        )
         session.add(prompt)
         await session.commit()
         return JobSubmissionResponse(**job_response)
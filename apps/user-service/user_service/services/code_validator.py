@@ -1,6 +1,8 @@
 import ast
 import re
 
+from render_analysis import analysis
+
 FORBIDDEN_MODULES = {
     "os",
     "sys",
@@ -46,19 +48,24 @@ class CodeVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
 
-def is_code_safe(code: str) -> tuple[bool, str]:
+def check_code(code: str) -> tuple[bool, str, dict | None]:
     try:
         tree = ast.parse(code)
     except SyntaxError as e:
-        return False, f"Code contains a syntax error: {e}"
+        return False, f"Code contains a syntax error: {e}", None
 
     visitor = CodeVisitor()
     visitor.visit(tree)
 
     if visitor.violations:
-        return False, visitor.violations[0]
+        return False, visitor.violations[0], None
+
+    return True, "Code passed basic safety check.", analysis.analyze_tree(tree)
 
-    return True, "Code passed basic safety check."
+
+def is_code_safe(code: str) -> tuple[bool, str]:
+    is_safe, reason, _ = check_code(code)
+    return is_safe, reason
 
 
 def parse_manim_code(raw_text: str) -> str | None:
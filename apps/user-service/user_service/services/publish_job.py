@@ -2,18 +2,33 @@ import datetime
 import logging
 import uuid
 import grpc
+import redis
 from google.api_core.client_options import ClientOptions
 from google.auth.credentials import AnonymousCredentials
 from google.cloud import pubsub_v1
+from render_analysis import analysis, envelope
 
 from ..dependencies.config import settings
 
 publisher = None
 topic_path = None
+render_state = None
+
+RECORD_LATEST_REQUEST_SCRIPT = """
+local current = redis.call("get", KEYS[1])
+if not current or tonumber(current) < tonumber(ARGV[1]) then
+    redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+end
+return 1
+"""
 
 
 async def initialize_publisher():
-    global publisher, topic_path
+    global publisher, topic_path, render_state
+    if settings.RENDER_STATE_REDIS_URL:
+        render_state = redis.Redis.from_url(
+            settings.RENDER_STATE_REDIS_URL, decode_responses=True
+        )
     try:
         if settings.emulator_host:
             logging.info(f"Connecting to Pub/Sub emulator at {settings.emulator_host}")
@@ -40,10 +55,13 @@ def submit_render_job(
     source_type: str,
     user_id: str,
     request_time_str: str,
+    code_analysis: dict | None = None,
 ) -> str:
     if not publisher or not topic_path:
         raise ConnectionError("Pub/Sub publisher is not available.")
 
+    if code_analysis is None:
+        code_analysis = analysis.analyze(code)
     job_id = str(uuid.uuid4())
     logging.info(f"Submitting render job {job_id} for user {user_id}")
     attributes = {
@@ -53,16 +71,65 @@ def submit_render_job(
         "source_type": source_type,
         "request_timestamp": request_time_str,
     }
-    logging.info(f"Preparing to publish attributes: {attributes}")
-    try:
-        future = publisher.publish(
-            topic_path,
-            data=code.encode("utf-8"),
-            **attributes,
+    if settings.JOB_ENVELOPE_ENABLED:
+        shipped_code = None if renderer_has_code(code_analysis["code_hash"]) else code
+        data = envelope.encode(
+            envelope.job_body(shipped_code, code_analysis),
+            settings.JOB_ENVELOPE_COMPRESS_THRESHOLD_BYTES,
         )
+        attributes[envelope.ENVELOPE_ATTRIBUTE] = str(envelope.ENVELOPE_VERSION)
+    else:
+        data = code.encode("utf-8")
+        attributes.update(analysis.to_attributes(code_analysis))
+    logging.info(
+        f"Preparing to publish {len(data)} bytes with attributes: {attributes}"
+    )
+    try:
+        future = publisher.publish(topic_path, data=data, **attributes)
         message_id = future.result()
         logging.info(f"Successfully published message {message_id} for job {job_id}.")
-        return job_id
     except Exception as e:
         logging.error(f"Failed to publish message for job {job_id}: {e}")
         raise
+    record_latest_request(source_type, source_id, request_time_str)
+    return job_id
+
+
+def estimate_compute_seconds(code_analysis: dict) -> float:
+    return max(
+        code_analysis["cost"] * settings.COMPUTE_SECONDS_PER_COST_UNIT,
+        settings.COMPUTE_MIN_RESERVATION_SECONDS,
+    )
+
+
+def renderer_has_code(code_hash: str) -> bool:
+    if not render_state:
+        return False
+    try:
+        return bool(
+            render_state.expire(
+                f"{settings.CODE_STORE_PREFIX}:{code_hash}",
+                settings.CODE_STORE_TTL_SECONDS,
+            )
+        )
+    except redis.RedisError as e:
+        logging.warning(f"Could not check the renderer's code store: {e}")
+        return False
+
+
+def record_latest_request(source_type: str, source_id: str, request_time_str: str):
+    if not render_state:
+        return
+    requested_at = datetime.datetime.fromisoformat(request_time_str).timestamp()
+    try:
+        render_state.eval(
+            RECORD_LATEST_REQUEST_SCRIPT,
+            1,
+            f"{settings.LATEST_REQUEST_PREFIX}:{source_type}:{source_id}",
+            requested_at,
+            settings.LATEST_REQUEST_TTL_SECONDS,
+        )
+    except redis.RedisError as e:
+        logging.warning(
+            f"Could not record the latest render request for {source_id}: {e}"
+        )
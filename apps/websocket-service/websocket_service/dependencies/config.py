@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     REDIS_HOST: str | None = None
     REDIS_PORT: int | None = None
     REDIS_CHANNEL: str = "video_links"
+    REDIS_PROGRESS_CHANNEL: str = "render_progress"
     DB_URL: str | None = None
 
     class Config:
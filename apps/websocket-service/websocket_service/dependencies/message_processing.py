@@ -1,16 +1,38 @@
 import datetime
 import logging
 
-from db_core.crud import data_crud
+from db_core.crud import data_crud, user_crud
 from db_core.schemas import CanvasUpdate, PromptUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import UserMessage
 
 
+async def settle_compute(payload_data: dict, session: AsyncSession) -> None:
+    job_id = payload_data.get("job_id")
+    if not job_id:
+        return
+    variant = payload_data.get("variant", "final")
+    final = not (variant == "preview" and payload_data.get("status") == "success")
+    reservation = await user_crud.settle_compute(
+        session,
+        job_id,
+        variant,
+        float(payload_data.get("cpu_seconds") or 0),
+        final,
+    )
+    if reservation is None:
+        logging.info(f"No unsettled compute reservation for job {job_id} {variant}.")
+        return
+    await session.commit()
+
+
 async def process_payload(
     payload_data: dict, session: AsyncSession
 ) -> UserMessage | None:
+    await settle_compute(payload_data, session)
+    if payload_data.get("status") == "superseded":
+        return None
 
     source_type = payload_data.get("source_type")
     source_id = payload_data.get("source_id")
@@ -18,6 +40,8 @@ async def process_payload(
     request_timestamp = datetime.datetime.fromisoformat(request_timestamp_str)
     status = payload_data.get("status")
     video_url = payload_data.get("video_url")
+    variant = payload_data.get("variant", "final")
+    url_field = "preview_url" if variant == "preview" else "video_url"
     if source_type == "canvas":
         item = await data_crud.get_canvas(session=session, canvas_id=source_id)
     elif source_type == "prompt":
@@ -31,14 +55,14 @@ async def process_payload(
 
     if status == "success" and video_url:
         if source_type == "canvas":
-            update_data = CanvasUpdate(video_url=video_url)
+            update_data = CanvasUpdate(**{url_field: video_url})
             await data_crud.update_canvas(
                 session=session, 
                 db_canvas=item, 
                 canvas_in=update_data
             )
         elif source_type == "prompt":
-            update_data = PromptUpdate(video_url=video_url)
+            update_data = PromptUpdate(**{url_field: video_url})
             await data_crud.update_prompt(
                 session=session, 
                 prompt=item,
@@ -47,9 +71,16 @@ async def process_payload(
         
         await session.commit()
 
+        if variant == "preview":
+            message = f"A preview of your {source_type} is ready."
+        else:
+            message = f"Your {source_type} has been successfully rendered."
         return UserMessage(
-            message=f"Your {source_type} has been successfully rendered.",
+            message=message,
             video_url=video_url,
+            video_urls=payload_data.get("video_urls"),
+            poster_url=payload_data.get("poster_url"),
+            variant=variant,
             source_id=str(source_id),
             source_type=source_type,
             status="success",
@@ -60,5 +91,6 @@ async def process_payload(
             message=f"An error occurred while processing your request for {source_type} with ID {source_id}.", # noqa: E501
             source_id=str(source_id),
             source_type=source_type,
+            variant=variant,
             detail=payload_data.get("error", "Unknown error occurred"),
         )
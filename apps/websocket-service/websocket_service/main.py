@@ -13,6 +13,7 @@ from .dependencies.security import (
     get_current_user_ws,
     initialize_firebase,
 )
+from .models import ProgressMessage
 from .redis_client import RedisClient
 from .websocket_manager import ConnectionManager
 
@@ -22,14 +23,23 @@ redis_client = RedisClient()
 
 async def redis_message_processor():
     logging.info("Starting Redis message processor...")
-    async for message in redis_client.listen(settings.REDIS_CHANNEL):
+    async for message in redis_client.listen(
+        settings.REDIS_CHANNEL, settings.REDIS_PROGRESS_CHANNEL
+    ):
         if message and message.get("type") == "message":
             payload_str = message["data"]
-            logging.info(f"Received from Redis: {payload_str}")
 
             try:
                 payload_data = json.loads(payload_str)
                 user_id = payload_data.get("user_id")
+                if message.get("channel") == settings.REDIS_PROGRESS_CHANNEL:
+                    if user_id:
+                        await connection_manager.send_personal_message(
+                            ProgressMessage(**payload_data), user_id
+                        )
+                    continue
+
+                logging.info(f"Received from Redis: {payload_str}")
                 async with get_session_context() as session:
                     user_message = await process_payload(payload_data, session=session)
 
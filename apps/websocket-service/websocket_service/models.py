@@ -4,7 +4,23 @@ from pydantic import BaseModel, Field
 class UserMessage(BaseModel):
     message: str
     video_url: str | None = None
+    video_urls: list[dict] | None = None
+    poster_url: str | None = None
+    variant: str = Field(default="final")
     source_id: str
     source_type: str
     status: str | None = Field(default="success")
     detail: str | None = None
+
+
+class ProgressMessage(BaseModel):
+    type: str = Field(default="progress")
+    source_id: str
+    source_type: str
+    variant: str = Field(default="final")
+    scene_name: str | None = None
+    animation: str | None = None
+    animation_index: int
+    total_animations: int
+    percent: float
+    eta_seconds: float | None = None
@@ -58,14 +58,14 @@ class RedisClient:
             self.redis_connection = None
         logging.info("Redis connection closed.")
 
-    async def listen(self, channel: str) -> AsyncGenerator[dict, None]:
+    async def listen(self, *channels: str) -> AsyncGenerator[dict, None]:
         while True:
             try:
                 if not self.redis_connection or not self._pubsub:
                     await self.connect()
 
-                await self._pubsub.subscribe(channel)
-                logging.info(f"Subscribed to Redis channel: '{channel}'")
+                await self._pubsub.subscribe(*channels)
+                logging.info(f"Subscribed to Redis channels: {channels}")
 
                 while True:
                     message = await self._pubsub.get_message(
@@ -5,7 +5,7 @@ from collections import defaultdict
 from fastapi import WebSocket
 from starlette.websockets import WebSocketState
 
-from .models import UserMessage
+from .models import ProgressMessage, UserMessage
 
 
 class ConnectionManager:
@@ -26,7 +26,9 @@ class ConnectionManager:
             if not connections:
                 del self.active_connections[user_id]
 
-    async def send_personal_message(self, message: UserMessage, user_id: str):
+    async def send_personal_message(
+        self, message: UserMessage | ProgressMessage, user_id: str
+    ):
         connections = self.active_connections.get(user_id, [])
         if not connections:
             return
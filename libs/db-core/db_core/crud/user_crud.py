@@ -1,6 +1,9 @@
+import datetime
+
+from sqlalchemy import delete, func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from ..models import User
+from ..models import ComputeReservation, User
 from ..schemas import UserUpdate
 
 
@@ -36,3 +39,97 @@ async def delete_user(session: AsyncSession, user_id: str) -> None:
     user = await get_user(session, user_id)
     if user:
         await session.delete(user)
+
+
+def reset_daily_usage(user: User) -> None:
+    today = datetime.datetime.now(datetime.UTC).date()
+    if user.last_request_date != today:
+        user.render_requests_today = 0
+        user.prompt_requests_today = 0
+        user.compute_seconds_today = 0
+        user.last_request_date = today
+
+
+def _start_of_today() -> datetime.datetime:
+    now = datetime.datetime.now(datetime.UTC)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def reserved_compute_seconds(session: AsyncSession, user_id: str) -> float:
+    now = datetime.datetime.now(datetime.UTC)
+    statement = select(
+        func.coalesce(func.sum(ComputeReservation.reserved_seconds), 0)
+    ).where(
+        ComputeReservation.user_id == user_id,
+        ComputeReservation.settled_at.is_(None),
+        ComputeReservation.expires_at > now,
+        ComputeReservation.created_at >= _start_of_today(),
+    )
+    result = await session.exec(statement)
+    return float(result.one())
+
+
+async def has_compute_budget(session: AsyncSession, user: User, seconds: float) -> bool:
+    reset_daily_usage(user)
+    reserved = await reserved_compute_seconds(session, user.user_id)
+    return user.compute_seconds_today + reserved + seconds <= (
+        user.compute_daily_budget_seconds
+    )
+
+
+async def reserve_compute(
+    session: AsyncSession,
+    user_id: str,
+    job_id: str,
+    seconds: float,
+    ttl_seconds: float,
+    retention_seconds: float,
+) -> ComputeReservation:
+    now = datetime.datetime.now(datetime.UTC)
+    await session.execute(
+        delete(ComputeReservation).where(
+            ComputeReservation.user_id == user_id,
+            ComputeReservation.created_at
+            < now - datetime.timedelta(seconds=retention_seconds),
+        )
+    )
+    reservation = ComputeReservation(
+        job_id=job_id,
+        user_id=user_id,
+        reserved_seconds=seconds,
+        created_at=now,
+        expires_at=now + datetime.timedelta(seconds=ttl_seconds),
+    )
+    session.add(reservation)
+    return reservation
+
+
+async def settle_compute(
+    session: AsyncSession,
+    job_id: str,
+    variant: str,
+    used_seconds: float,
+    final: bool,
+) -> ComputeReservation | None:
+    statement = (
+        select(ComputeReservation)
+        .where(ComputeReservation.job_id == job_id)
+        .with_for_update()
+    )
+    reservation = (await session.exec(statement)).first()
+    if not reservation:
+        return None
+    charged = [name for name in reservation.charged_variants.split(",") if name]
+    if variant in charged:
+        return None
+    user = await get_user(session, reservation.user_id, for_update=True)
+    if user:
+        reset_daily_usage(user)
+        user.compute_seconds_today += used_seconds
+        session.add(user)
+    reservation.used_seconds += used_seconds
+    reservation.charged_variants = ",".join([*charged, variant])
+    if final:
+        reservation.settled_at = datetime.datetime.now(datetime.UTC)
+    session.add(reservation)
+    return reservation
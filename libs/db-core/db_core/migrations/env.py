@@ -12,7 +12,12 @@ from sqlmodel import SQLModel
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.insert(0, project_root)
-from db_core.models import Canvas, Prompt, User  # noqa: E402, F401
+from db_core.models import (  # noqa: E402, F401
+    Canvas,
+    ComputeReservation,
+    Prompt,
+    User,
+)
 
 load_dotenv()
 db_url = os.getenv("DB_URL")
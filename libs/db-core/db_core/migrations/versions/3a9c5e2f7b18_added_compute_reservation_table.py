@@ -0,0 +1,63 @@
+"""Added compute reservation table
+
+Revision ID: 3a9c5e2f7b18
+Revises: 8f3b6d1c4e27
+Create Date: 2026-10-17 17:48:09.315724
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9c5e2f7b18"
+down_revision: str | Sequence[str] | None = "8f3b6d1c4e27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "compute_reservation",
+        sa.Column("job_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("user_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("reserved_seconds", sa.Float(), nullable=False),
+        sa.Column("used_seconds", sa.Float(), nullable=False),
+        sa.Column(
+            "charged_variants", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("settled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.user_id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_index(
+        op.f("ix_compute_reservation_user_id"),
+        "compute_reservation",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_column("user", "compute_reserved_seconds")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "user",
+        sa.Column(
+            "compute_reserved_seconds", sa.Float(), server_default="0", nullable=False
+        ),
+    )
+    op.drop_index(
+        op.f("ix_compute_reservation_user_id"), table_name="compute_reservation"
+    )
+    op.drop_table("compute_reservation")
@@ -0,0 +1,50 @@
+"""Added compute budget to user
+
+Revision ID: 8f3b6d1c4e27
+Revises: 5c1e9a7d2b40
+Create Date: 2026-10-17 14:26:51.902113
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3b6d1c4e27"
+down_revision: str | Sequence[str] | None = "5c1e9a7d2b40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "user",
+        sa.Column(
+            "compute_daily_budget_seconds",
+            sa.Float(),
+            server_default="1800",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "user",
+        sa.Column(
+            "compute_seconds_today", sa.Float(), server_default="0", nullable=False
+        ),
+    )
+    op.add_column(
+        "user",
+        sa.Column(
+            "compute_reserved_seconds", sa.Float(), server_default="0", nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("user", "compute_reserved_seconds")
+    op.drop_column("user", "compute_seconds_today")
+    op.drop_column("user", "compute_daily_budget_seconds")
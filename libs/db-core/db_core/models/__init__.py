@@ -1,4 +1,5 @@
 from .canvas_model import Canvas
+from .compute_reservation_model import ComputeReservation
 from .prompt_model import Prompt
 from .user_model import User
 
@@ -6,4 +7,4 @@ User.model_rebuild()
 Canvas.model_rebuild()
 Prompt.model_rebuild()
 
-__all__ = ["User", "Canvas", "Prompt"]
+__all__ = ["User", "Canvas", "Prompt", "ComputeReservation"]
@@ -18,6 +18,7 @@ class Canvas(SQLModel, table=True):
     title: str
     code: str | None = None
     video_url: str | None = None
+    preview_url: str | None = None
     updated_at: datetime.datetime = Field(
         default_factory=get_utc_now, sa_column=Column(DateTime(timezone=True))
     )
@@ -0,0 +1,25 @@
+import datetime
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+def get_utc_now():
+    return datetime.datetime.now(datetime.UTC)
+
+
+class ComputeReservation(SQLModel, table=True):
+    __tablename__ = "compute_reservation"
+
+    job_id: str = Field(primary_key=True)
+    user_id: str = Field(foreign_key="user.user_id", ondelete="CASCADE", index=True)
+    reserved_seconds: float = Field(nullable=False)
+    used_seconds: float = Field(default=0, nullable=False)
+    charged_variants: str = Field(default="", nullable=False)
+    created_at: datetime.datetime = Field(
+        default_factory=get_utc_now, sa_column=Column(DateTime(timezone=True))
+    )
+    expires_at: datetime.datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    settled_at: datetime.datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
@@ -18,6 +18,7 @@ class Prompt(SQLModel, table=True):
     prompt_text: str
     code: str | None = None
     video_url: str | None = None
+    preview_url: str | None = None
     updated_at: datetime.datetime = Field(
         default_factory=get_utc_now, sa_column=Column(DateTime(timezone=True))
     )
@@ -20,6 +20,8 @@ class User(SQLModel, table=True):
     render_daily_limit: int = Field(default=30, nullable=False)
     prompt_requests_today: int = Field(default=0, nullable=False)
     render_requests_today: int = Field(default=0, nullable=False)
+    compute_daily_budget_seconds: float = Field(default=1800, nullable=False)
+    compute_seconds_today: float = Field(default=0, nullable=False)
     last_request_date: datetime.date | None = None
     canvases: list["Canvas"] = Relationship(
         back_populates="author", cascade_delete=True
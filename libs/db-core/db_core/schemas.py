@@ -17,6 +17,7 @@ class CanvasCreate(SQLModel):
 class CanvasUpdate(SQLModel):
     code: str | None = None
     video_url: str | None = None
+    preview_url: str | None = None
     title: str | None = None
     latest_render_at: datetime.datetime | None = None
 
@@ -28,6 +29,7 @@ class PromptCreate(SQLModel):
 
 class PromptUpdate(SQLModel):
     video_url: str | None = None
+    preview_url: str | None = None
     prompt_text: str | None = None
     code: str | None = None
     latest_render_at: datetime.datetime | None = None
@@ -0,0 +1 @@
+"""Automatically generated by Nx."""
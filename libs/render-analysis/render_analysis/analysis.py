@@ -0,0 +1,114 @@
+import ast
+import hashlib
+
+from render_analysis import estimator
+
+ANALYSIS_VERSION = "1"
+MAX_ATTRIBUTE_BYTES = 1024
+LIST_SEPARATOR = ","
+
+
+def _base_name(base: ast.expr) -> str | None:
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        return base.attr
+    return None
+
+
+def scene_names(tree: ast.Module) -> list[str]:
+    names: list[str] = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for base in node.bases:
+            base_name = _base_name(base)
+            if base_name and (base_name.endswith("Scene") or base_name in names):
+                names.append(node.name)
+                break
+    return names
+
+
+def imports(tree: ast.Module) -> list[str]:
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split(".")[0])
+    return sorted(modules)
+
+
+def _hash(normalized: str) -> str:
+    digest = hashlib.sha256(f"{ANALYSIS_VERSION}\0{normalized}".encode())
+    return digest.hexdigest()
+
+
+def tree_hash(tree: ast.Module) -> str:
+    return _hash(ast.dump(tree, annotate_fields=False, include_attributes=False))
+
+
+def code_hash(code: str) -> str:
+    try:
+        return tree_hash(ast.parse(code))
+    except SyntaxError:
+        return _hash(code.strip())
+
+
+def analyze_tree(tree: ast.Module) -> dict:
+    names = scene_names(tree)
+    return {
+        "version": ANALYSIS_VERSION,
+        "code_hash": tree_hash(tree),
+        "scene_names": names,
+        "imports": imports(tree),
+        "animation_counts": {
+            name: estimator.count_animations(tree, name) for name in names
+        },
+        "cost": estimator.cost_features(tree)["cost"],
+    }
+
+
+def analyze(code: str) -> dict:
+    return analyze_tree(ast.parse(code))
+
+
+def to_attributes(analysis: dict) -> dict[str, str]:
+    names = analysis["scene_names"]
+    attributes = {
+        "analysis_version": analysis["version"],
+        "code_hash": analysis["code_hash"],
+        "scene_names": LIST_SEPARATOR.join(names),
+        "animation_counts": LIST_SEPARATOR.join(
+            str(analysis["animation_counts"][name]) for name in names
+        ),
+        "imports": LIST_SEPARATOR.join(analysis["imports"]),
+        "render_cost": str(analysis["cost"]),
+    }
+    if any(len(value.encode()) > MAX_ATTRIBUTE_BYTES for value in attributes.values()):
+        return {"render_cost": attributes["render_cost"]}
+    return attributes
+
+
+def _split(value: str) -> list[str]:
+    return value.split(LIST_SEPARATOR) if value else []
+
+
+def from_attributes(attributes: dict) -> dict | None:
+    if attributes.get("analysis_version") != ANALYSIS_VERSION:
+        return None
+    try:
+        names = _split(attributes["scene_names"])
+        counts = [int(count) for count in _split(attributes["animation_counts"])]
+        if len(counts) != len(names):
+            return None
+        return {
+            "version": ANALYSIS_VERSION,
+            "code_hash": attributes["code_hash"],
+            "scene_names": names,
+            "imports": _split(attributes.get("imports", "")),
+            "animation_counts": dict(zip(names, counts, strict=True)),
+            "cost": float(attributes["render_cost"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,67 @@
+import json
+import zlib
+
+ENVELOPE_VERSION = 1
+ENVELOPE_ATTRIBUTE = "envelope"
+MAGIC = b"MJ"
+HEADER_SIZE = len(MAGIC) + 2
+FLAG_COMPRESSED = 0x01
+DEFAULT_COMPRESS_THRESHOLD_BYTES = 512
+MAX_BODY_BYTES = 4 * 1024 * 1024
+ANALYSIS_FIELDS = ("code_hash", "scene_names", "animation_counts", "cost")
+
+
+class EnvelopeError(ValueError):
+    pass
+
+
+def job_body(code: str | None, code_analysis: dict) -> dict:
+    body = {"analysis": code_analysis}
+    if code is not None:
+        body["code"] = code
+    return body
+
+
+def encode(
+    body: dict, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD_BYTES
+) -> bytes:
+    payload = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode()
+    flags = 0
+    if len(payload) >= compress_threshold:
+        compressed = zlib.compress(payload)
+        if len(compressed) < len(payload):
+            payload = compressed
+            flags |= FLAG_COMPRESSED
+    return MAGIC + bytes([ENVELOPE_VERSION, flags]) + payload
+
+
+def _decompress(payload: bytes) -> bytes:
+    decompressor = zlib.decompressobj()
+    try:
+        body = decompressor.decompress(payload, MAX_BODY_BYTES)
+    except zlib.error as e:
+        raise EnvelopeError(f"Corrupt compressed envelope: {e}") from e
+    if decompressor.unconsumed_tail or not decompressor.eof:
+        raise EnvelopeError("Compressed envelope is truncated or too large.")
+    return body
+
+
+def decode(data: bytes) -> dict:
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        raise EnvelopeError("Message is not a render job envelope.")
+    version, flags = data[len(MAGIC)], data[len(MAGIC) + 1]
+    if version != ENVELOPE_VERSION:
+        raise EnvelopeError(f"Unsupported envelope version {version}.")
+    payload = data[HEADER_SIZE:]
+    if flags & FLAG_COMPRESSED:
+        payload = _decompress(payload)
+    try:
+        body = json.loads(payload)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise EnvelopeError(f"Malformed envelope body: {e}") from e
+    if not isinstance(body, dict) or not isinstance(body.get("analysis"), dict):
+        raise EnvelopeError("Envelope is missing the code analysis.")
+    missing = [name for name in ANALYSIS_FIELDS if name not in body["analysis"]]
+    if missing:
+        raise EnvelopeError(f"Envelope analysis is missing {', '.join(missing)}.")
+    return body
@@ -0,0 +1,133 @@
+import ast
+
+ANIMATION_METHODS = {"play", "wait"}
+DEFAULT_LOOP_ITERATIONS = 5
+DEFAULT_RUN_TIME = 1.0
+ANIMATION_OVERHEAD = 0.5
+MOBJECT_WEIGHT = 0.05
+
+
+def _loop_iterations(node: ast.For) -> int:
+    iterator = node.iter
+    if (
+        isinstance(iterator, ast.Call)
+        and isinstance(iterator.func, ast.Name)
+        and iterator.func.id == "range"
+        and iterator.args
+        and all(isinstance(arg, ast.Constant) for arg in iterator.args)
+    ):
+        try:
+            return len(range(*(arg.value for arg in iterator.args)))
+        except (TypeError, ValueError):
+            return DEFAULT_LOOP_ITERATIONS
+    if isinstance(iterator, ast.List | ast.Tuple):
+        return len(iterator.elts)
+    return DEFAULT_LOOP_ITERATIONS
+
+
+def _is_animation_call(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr in ANIMATION_METHODS
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+    )
+
+
+def _is_mobject_call(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id[:1].isupper()
+    )
+
+
+def _literal_number(node: ast.AST | None) -> float | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, int | float):
+        return float(node.value)
+    return None
+
+
+def _run_time(call: ast.Call) -> float:
+    keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+    if call.func.attr == "wait":
+        duration = keywords.get("duration", call.args[0] if call.args else None)
+        value = _literal_number(duration)
+    else:
+        value = _literal_number(keywords.get("run_time"))
+    return DEFAULT_RUN_TIME if value is None else value
+
+
+def _collect(nodes: list[ast.AST], stats: dict, multiplier: int = 1):
+    for node in nodes:
+        if isinstance(node, ast.For | ast.While):
+            iterations = (
+                _loop_iterations(node)
+                if isinstance(node, ast.For)
+                else DEFAULT_LOOP_ITERATIONS
+            )
+            stats["loops"] += 1
+            _collect(node.body, stats, multiplier * iterations)
+            _collect(node.orelse, stats, multiplier)
+            continue
+        children = list(ast.iter_child_nodes(node))
+        if _is_animation_call(node):
+            stats["animations"] += multiplier
+            stats["run_time"] += multiplier * _run_time(node)
+            children = [
+                grandchild
+                for child in node.args
+                for grandchild in ast.iter_child_nodes(child)
+            ] + [keyword.value for keyword in node.keywords]
+        elif _is_mobject_call(node):
+            stats["mobjects"] += multiplier
+        _collect(children, stats, multiplier)
+
+
+def _empty_stats() -> dict:
+    return {"animations": 0, "run_time": 0.0, "loops": 0, "mobjects": 0}
+
+
+def find_class(tree: ast.Module, class_name: str) -> ast.ClassDef | None:
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            return node
+    return None
+
+
+def count_animations(tree: ast.Module, scene_name: str) -> int:
+    scene = find_class(tree, scene_name)
+    if scene is None:
+        return 0
+    stats = _empty_stats()
+    _collect(scene.body, stats)
+    return stats["animations"]
+
+
+def estimate_animation_count(code: str, scene_name: str) -> int:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return 0
+    return count_animations(tree, scene_name)
+
+
+def cost_features(tree: ast.Module) -> dict:
+    stats = _empty_stats()
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            _collect(node.body, stats)
+    cost = (
+        stats["run_time"] * (1 + MOBJECT_WEIGHT * stats["mobjects"])
+        + ANIMATION_OVERHEAD * stats["animations"]
+    )
+    return {**stats, "cost": round(cost, 3)}
+
+
+def analyze_cost(code: str) -> dict:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {**_empty_stats(), "cost": 0.0}
+    return cost_features(tree)
@@ -0,0 +1 @@
+"""Unit tests configuration module."""
@@ -0,0 +1,59 @@
+import pytest
+
+from render_analysis import analysis
+
+SCENES_CODE = """
+import numpy as np
+from manim import *
+from manim.utils import rate_functions
+
+class Intro(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+        self.wait()
+
+class Outro(Intro):
+    def construct(self):
+        for i in range(3):
+            self.play(FadeIn(Square()))
+"""
+
+
+def test_analyze_collects_scenes_imports_and_counts():
+    """
+    Tests that one analysis pass records scenes, imports, counts and cost.
+    """
+    record = analysis.analyze(SCENES_CODE)
+
+    assert record["scene_names"] == ["Intro", "Outro"]
+    assert record["imports"] == ["manim", "numpy"]
+    assert record["animation_counts"] == {"Intro": 2, "Outro": 3}
+    assert record["cost"] > 0
+    assert record["code_hash"] == analysis.code_hash(SCENES_CODE)
+    with pytest.raises(SyntaxError):
+        analysis.analyze("class Broken(Scene:\n    pass")
+
+
+def test_code_hash_ignores_formatting():
+    """
+    Tests that the code hash is stable across comments and whitespace changes.
+    """
+    reformatted = SCENES_CODE.replace("Circle()", "Circle( )") + "\n# trailing\n"
+
+    assert analysis.code_hash(reformatted) == analysis.code_hash(SCENES_CODE)
+    assert analysis.code_hash(SCENES_CODE.replace("range(3)", "range(4)")) != (
+        analysis.code_hash(SCENES_CODE)
+    )
+
+
+def test_attributes_round_trip():
+    """
+    Tests that the analysis survives encoding as Pub/Sub attributes.
+    """
+    record = analysis.analyze(SCENES_CODE)
+    attributes = analysis.to_attributes(record)
+
+    assert all(isinstance(value, str) for value in attributes.values())
+    assert analysis.from_attributes(attributes) == record
+    assert analysis.from_attributes({"render_cost": "1.0"}) is None
+    assert analysis.from_attributes({**attributes, "animation_counts": "2"}) is None
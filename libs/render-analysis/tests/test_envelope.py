@@ -0,0 +1,58 @@
+import pytest
+
+from render_analysis import analysis, envelope
+
+SCENE_CODE = """
+from manim import *
+
+class Spiral(Scene):
+    def construct(self):
+        dots = VGroup(*[Dot(RIGHT * i * 0.1).rotate(i * 0.3) for i in range(60)])
+        self.play(Create(dots), run_time=3)
+"""
+
+
+def test_envelope_round_trip_compresses_large_bodies():
+    """
+    Tests that bodies above the threshold are compressed and decode unchanged.
+    """
+    code = SCENE_CODE * 20
+    body = envelope.job_body(code, analysis.analyze(code))
+
+    small = envelope.encode(envelope.job_body(SCENE_CODE, analysis.analyze(SCENE_CODE)))
+    large = envelope.encode(body)
+
+    assert small[3] & envelope.FLAG_COMPRESSED == 0
+    assert large[3] & envelope.FLAG_COMPRESSED
+    assert len(large) < len(code)
+    assert envelope.decode(large) == body
+
+
+def test_hash_only_envelope_omits_code():
+    """
+    Tests that a hash-only envelope carries the analysis but no code.
+    """
+    record = analysis.analyze(SCENE_CODE)
+
+    body = envelope.decode(envelope.encode(envelope.job_body(None, record)))
+
+    assert "code" not in body
+    assert body["analysis"]["code_hash"] == record["code_hash"]
+
+
+def test_decode_rejects_foreign_and_corrupt_messages():
+    """
+    Tests that raw code, unknown versions and corrupt payloads are rejected.
+    """
+    encoded = envelope.encode(
+        envelope.job_body(SCENE_CODE * 20, analysis.analyze(SCENE_CODE))
+    )
+
+    for data in (
+        SCENE_CODE.encode(),
+        encoded[:2] + bytes([envelope.ENVELOPE_VERSION + 1]) + encoded[3:],
+        encoded[:-10],
+        envelope.MAGIC + bytes([envelope.ENVELOPE_VERSION, 0]) + b'{"code": "x"}',
+    ):
+        with pytest.raises(envelope.EnvelopeError):
+            envelope.decode(data)
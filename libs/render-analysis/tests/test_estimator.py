@@ -0,0 +1,45 @@
+from render_analysis import estimator
+
+LOOPED_CODE = """
+from manim import *
+
+class LoopScene(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+        for i in range(3):
+            self.play(Rotate(Square()))
+        self.wait()
+"""
+
+TIMED_CODE = """
+from manim import *
+
+class TimedScene(Scene):
+    def construct(self):
+        dots = [Dot() for _ in range(3)]
+        self.play(Create(Circle()), run_time=4)
+        for dot in [1, 2]:
+            self.play(FadeIn(Square()), run_time=0.5)
+        self.wait(2)
+"""
+
+
+def test_estimate_animation_count_unrolls_constant_loops():
+    """
+    Tests that play and wait calls are counted with constant loop bounds applied.
+    """
+    assert estimator.estimate_animation_count(LOOPED_CODE, "LoopScene") == 5
+    assert estimator.estimate_animation_count(LOOPED_CODE, "Missing") == 0
+
+
+def test_analyze_cost_sums_literal_run_times_and_mobjects():
+    """
+    Tests that the estimator sums run_time literals, loops and mobject counts.
+    """
+    analysis = estimator.analyze_cost(TIMED_CODE)
+
+    assert analysis["animations"] == 4
+    assert analysis["run_time"] == 7.0
+    assert analysis["loops"] == 1
+    assert analysis["mobjects"] == 4
+    assert analysis["cost"] > analysis["run_time"]